@@ -19,26 +19,43 @@ Character frequency is a good metric. Evaluate each output and choose
 the one with the best score. 
 """
 
-from freqy import chi_squared
+from freqy import chi_squared_keys
 from hexstr import Hexstr
+from keyprune import candidate_keys
+import ngram
 
-def bruteforce_xor(message):
+def bruteforce_xor(message, cache=None):
     """Brute force single byte xor decrypt.
     
     Message is passed as a Hexstr object. Return a list of results,
     and their accompanying Chi Squared Statistic value.
+
+    Every key is scored from one histogram of the message, and only keys
+    which turn each distinct message byte printable are decrypted. The
+    scores are looked up in, and stored to, cache if one is given.
     """
+    if cache is not None:
+        scores = cache.cached('single-xor-scores', message.bytestr,
+                              chi_squared_keys)
+    else:
+        scores = chi_squared_keys(message.bytestr)
     results = []
-    for i in range(256):
-        # Generate an approrpiate Hexstr key
-        xorkey = Hexstr(i)
-        xorkey.update(xorkey.value * (len(message.value) // 2))
-        result = message ^ xorkey
-        if result.is_printable():
-            score = chi_squared(result.value)
-            results.append((result, score, i))
+    for i in candidate_keys(message.buffer):
+        result = message ^ Hexstr(bytes([i]) * len(message))
+        results.append((result, scores[i], i))
     return results
 
+def bruteforce_xor_ngram(message, model=None):
+    """Brute force single byte xor decrypt by trigram log-likelihood.
+
+    Keys which can no longer beat the best so far are abandoned early.
+    Scores with the english.txt trigram model unless model is given.
+    Returns the best (result, score, key).
+    """
+    model = model or ngram.get_model()
+    key, score = model.score_keys(message.buffer)
+    return message ^ Hexstr(bytes([key]) * len(message)), score, key
+
 
 if __name__ == "__main__":
 
@@ -52,3 +69,7 @@ if __name__ == "__main__":
     for guess in best_guesses:
         str_repr = guess[0].bytestr.decode() 
         print('(0x{:x}) {:.2f}: {}'.format(guess[2], guess[1], str_repr))
+
+    result, score, key = bruteforce_xor_ngram(hs)
+    print('Trigram best guess:')
+    print('(0x{:x}) {:.2f}: {}'.format(key, score, result.bytestr.decode()))
@@ -15,56 +15,24 @@ etc.
 (Your code from #3 should help.)
 """
 
-from binascii import hexlify, unhexlify, b2a_qp
-import sys
-
-def xor_strings(xs, ys):
-    """
-    Take two strings, xs - an encrypted hex string, ys - a single byte XOR key (also a hex string)
-    assumes the strings are passed as utf-8, and will return a hex string also as utf-8
-    """
-    # I'm guessing this could be a one liner, but with all of the conversions
-    # it's much more readable to split it out like this..
-    xor_byte_string = b''
-    for x, y in zip(unhexlify(xs), unhexlify(ys)):
-        xor_byte_string += int(x ^ y).to_bytes(1, sys.byteorder)
-    return hexlify(xor_byte_string).decode('utf-8')
-
-def is_english_word(word, wordset):
-    return word.lower() in wordset
-
-def is_english_phrase(phrase, wordset):
-    "If string has more than 3 English words, probably decrypted properly"
-    english_word_count = 0
-    threshhold = 3
-    for word in phrase.lower().split(' '):
-        if(is_english_word(word, wordset)):
-            english_word_count += 1
-    return english_word_count >= threshhold
-
-# Create a set of English words for later scoring
-with open("./english-words/words.txt") as word_file:
-    english_words = set(word.strip().lower() for word in word_file)
-
-# Create a set of encoded hex strings
-with open("4.txt") as encoded_string_file:
-    encoded_hexstr_set = set(hexstr.strip() for hexstr in encoded_string_file)
-
-# Brute force each encoded hexstr 
-for hexstr in encoded_hexstr_set:
-    key_len = len(hexstr) // 2
-
-    # Brute force every byte 0 -> 255 (\x00 -> \xFF)
-    for key in range(0, 256):
-        # generate a hex string 'key' the same length as the encoded string
-        xor_key = hexlify(chr(key).encode('latin-1') * key_len).decode('latin-1')
-        xor_result = xor_strings(hexstr, xor_key)
-        try:
-            unicode_string = unhexlify(xor_result).decode('ascii')
-        except UnicodeDecodeError:
-            pass
-        else:
-            if is_english_phrase(unicode_string, english_words):
-                print('For hexstr: {}'.format(hexstr))
-                print('with key: {}'.format(xor_key))
-                print(unicode_string)
+from binascii import unhexlify
+from xordetect import detect
+import argparse
+import instrument
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Detect single-byte XOR')
+    instrument.add_arguments(parser)
+    # Counters are only collected in this process, so don't fan out
+    workers = 1 if instrument.setup(parser.parse_args()) else None
+
+    # Stream the encoded hex strings through the batch detector, and keep
+    # only the best scoring (line, key, score) results
+    with instrument.stage('scan'), open("4.txt") as encoded_string_file:
+        results = detect(encoded_string_file, top=3, workers=workers)
+
+    for hexstr, key, score in results:
+        plain = bytes(b ^ key for b in unhexlify(hexstr))
+        print('For hexstr: {}'.format(hexstr))
+        print('with key: 0x{:02x} ({:.2f})'.format(key, score))
+        print(plain)
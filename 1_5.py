@@ -23,19 +23,8 @@ Here is the opening stanza of an important work of the English language:
 
 """
 
-from binascii import hexlify, unhexlify
-from itertools import cycle
-
-def hexstr(s):
-    "Pass a normal utf-8 string, and get a hexstr back"
-    return hexlify(s.encode('utf-8')).decode('utf-8')
-
-def hexstr_to_str(hexstr):
-    "Take a hexstr and convert it to printable utf-8"
-    return unhexlify(hexstr).decode('utf-8')
-
-def repeating_xor(message, key):
-    return ''.join(chr(ord(c) ^ ord(k)) for c, k in zip(message, cycle(key)))
+from cryptostr import bytes_to_hexstr
+from repxor import repeating_xor
 
 stanza = """Burning 'em, if you ain't quick and nimble
 I go crazy when I hear a cymbal"""
@@ -44,9 +33,8 @@ key = 'ICE'
 print('Original:\n{}'.format(stanza))
 print('Encrypting with key: {}'.format(key))
 
-encrypted = repeating_xor(stanza, key)
-print('Encrypted:\n{}'.format(encrypted))
+encrypted = repeating_xor(stanza.encode('utf-8'), key)
+print('Encrypted:\n{}'.format(bytes_to_hexstr(encrypted)))
 
-print(type(encrypted))
 decrypted = repeating_xor(encrypted, key)
-print('Decrypted:\n{}'.format(decrypted))
+print('Decrypted:\n{}'.format(decrypted.decode('utf-8')))
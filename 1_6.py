@@ -67,129 +67,56 @@ In particular: the "wokka wokka!!!" edit distance really is 37.
 # IMPORTS
 #######################################
 
-from cryptostr import hamming_distance, bytes_to_hexstr, int_to_hexstr
-from binascii import a2b_base64
-from itertools import cycle, zip_longest
-from brutexor import score_xor
-import sys
-import string
+from repxor import beam_search, estimate_keysize
+from loaders import load_base64
+import argparse
+import instrument
+import os
 
 #######################################
 # DEFINES
 #######################################
 
 NUM_MOST_FREQ_LETTERS = 5
-NUM_CHUNKS = 10
 MIN_KEYSIZE = 2
-MAX_KEYSIZE = 41
-
-#######################################
-# FUNCTIONS
-#######################################
-
-def repeating_xor(message, key):
-    return ''.join(chr(ord(c) ^ ord(k)) for c, k in zip(message, cycle(key)))
+MAX_KEYSIZE = 40
+# Processes solving the top keysizes, one per CPU
+WORKERS = os.cpu_count() or 1
 
 #######################################
 # MAIN
 #######################################
 
-with open('6.txt') as infile:
-    encrypted = a2b_base64(infile.read())
-
-# Guess keysize by calculating hamming distance between groups of bytes
-best_guess_key = 0 
-lowest_distances = {}
-for keysize in range(MIN_KEYSIZE, MAX_KEYSIZE):
-    chunks = []
-    start, end = 0, keysize
-    for _ in range(NUM_CHUNKS):
-        chunks.append(encrypted[start:end])
-        start, end = end, end + keysize
-
-    # find the hamming distance between them
-    chunked_hexstr = [bytes_to_hexstr(s) for s in chunks]
-    distances = []
-    for i in range(NUM_CHUNKS - 1):
-        distances.append(hamming_distance(chunked_hexstr[i], 
-                                          chunked_hexstr[i+1]))
-
-    # normalise by dividing by keysize
-    normalised = [distance / keysize for distance in distances]
-    result = sum(normalised) / len(normalised)
-    lowest_distances[keysize] = result
-
-sorted_distances = list(lowest_distances.items())
-sorted_distances.sort(key=lambda index: index[1])
-sorted_distances = sorted_distances[:NUM_MOST_FREQ_LETTERS] 
-print('Keys with the lowest 5 hamming distances:')
-for key, freq in sorted_distances:
-    print('The key {} has a hamming distance of {}'.format(key, freq))
-
-keysize = int(sorted_distances[0][0])
-print('Attempting keysize of: {}'.format(keysize))
-
-# Break cipher text into blocks of keysize
-chunked_cipher = (encrypted[i:i + keysize] for i in range(0, len(encrypted), 
-                                                          keysize))
-
-# Transpose each first byte to a new string, second byte to a second 
-# string.. etc.
-transposed = (bytes(t) for t in zip_longest(*chunked_cipher, fillvalue=0))
-
-# Hold the highest scores and associated keys for each block
-highest_score = 0
-blocks_best_keys = [dict() for _ in range(keysize)] 
-blocks_highest_score = []
-
-# Determine highest English char frequency for each block
-for block, message in enumerate(transposed):
-    blocks_highest_score.append(0)
-    hexstr = bytes_to_hexstr(message)
-    # Brute force for single byte key
-    for key in range(0, 256):
-        _, score = score_xor(hexstr, key)
-        if score and score >= highest_score:
-            short_key = int_to_hexstr(key)
-            if score not in blocks_best_keys[block]:
-                blocks_best_keys[block][score] = [short_key]
-            else:
-                blocks_best_keys[block][score].append(short_key)
-            highest_score = score
-            blocks_highest_score[block] = highest_score
-    # Reset score for next block
-    highest_score = 0 
-
-# Now we have the highest scores and probable keys... Run through again to 
-# determine which of the keys have the best results
-# Redo the generators:
-chunked_cipher = (encrypted[i:i + keysize] for i in range(0, len(encrypted), 
-                                                          keysize))
-transposed = (bytes(t) for t in zip_longest(*chunked_cipher, fillvalue=0))
-# Print out most likely keys, with some broken out text for manual analysis
-finalkey = ''
-highest_char_count = 0
-for block, message in enumerate(transposed):
-    print('------------------- {} -------------------'.format(block))
-    print('Possible keys:')
-    score = blocks_highest_score[block]
-    for key in blocks_best_keys[block][score]:
-        printable_key = chr(int(key, 16))
-        if printable_key in string.ascii_letters or string.punctuation \
-                                                 or string.whitespace:
-            result, _ = score_xor(bytes_to_hexstr(message), ord(printable_key))
-            filtered_result = ''.join(c for c in result 
-                                      if c in string.ascii_lowercase)
-            if len(filtered_result) > highest_char_count:
-                highest_char_count = len(filtered_result)
-                best_key = printable_key
-            print('({}) {}: {}'.format(score, printable_key, filtered_result))
-    finalkey += best_key
-    highest_char_count = 0
-
-print('==========================================')
-print('Likely key: {}'.format(finalkey))
-print('Attempting to decrypt...')
-print('==========================================')
-message = encrypted.decode('utf-8')
-print(repeating_xor(message, finalkey))
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Break repeating-key XOR')
+    instrument.add_arguments(parser)
+    # Counters are only collected in this process, so don't fan out
+    profiling = instrument.setup(parser.parse_args())
+    workers = 1 if profiling else WORKERS
+
+    encrypted = load_base64('6.txt')
+
+    # Guess keysize by the normalised hamming distance between bytes one
+    # keysize apart, averaged across the whole ciphertext
+    with instrument.stage('keysize'):
+        sorted_distances = estimate_keysize(encrypted, MIN_KEYSIZE,
+                                            MAX_KEYSIZE)
+    print('Keys with the lowest 5 hamming distances:')
+    for key, distance, confidence in sorted_distances[:NUM_MOST_FREQ_LETTERS]:
+        print('The key {} has a hamming distance of {:.4f} ({:.2f} sigma)'
+              .format(key, distance, confidence))
+
+    # Don't just trust the lowest distance: solve each of the top keysizes
+    # fully, in parallel, and keep the one whose plaintext looks most
+    # English
+    finalkey, decrypted, margin = beam_search(
+        encrypted, NUM_MOST_FREQ_LETTERS, workers=workers,
+        ranking=sorted_distances)
+    print('Best keysize: {} (margin over runner-up: {})'.format(
+          len(finalkey), margin))
+
+    print('==========================================')
+    print('Likely key: {}'.format(finalkey.decode('utf-8', errors='replace')))
+    print('Decrypting...')
+    print('==========================================')
+    print(decrypted.decode('utf-8', errors='replace'))
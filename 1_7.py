@@ -29,17 +29,21 @@ it a lot later on, and not just for attacking ECB.
 # IMPORTS
 #######################################
 
-from binascii import a2b_base64
-from Crypto.Cipher import AES
+from blockcipher import get_cipher, BACKENDS
+from loaders import load_base64
+import argparse
 
 #######################################
 # MAIN
 #######################################
 
-with open('7.txt') as infile:
-    encrypted = a2b_base64(infile.read())
+parser = argparse.ArgumentParser(description='Decrypt AES in ECB mode')
+parser.add_argument('--backend', choices=BACKENDS, default='auto')
+args = parser.parse_args()
 
-key = 'YELLOW SUBMARINE'
-encryptor = AES.new(key, AES.MODE_ECB)
-decrypted = encryptor.decrypt(encrypted)
+encrypted = load_base64('7.txt')
+
+key = b'YELLOW SUBMARINE'
+decrypted = get_cipher(key, new_cipher=BACKENDS[args.backend]
+                       ).decrypt_blocks(encrypted)
 print(decrypted.decode('utf-8'))
@@ -20,38 +20,22 @@ the same 16 byte ciphertext.
 # IMPORTS
 #######################################
 
-import re
+from ecbdetect import detect_ecb
 
 #######################################
 # DEFINES
 #######################################
 
 BLOCK_SIZE = 16
-REPEATER = re.compile(r'(.+?)\1+$')
 
-#######################################
-# FUNCTIONS
-#######################################
-
-def repeater(s):
-    "Find a repeating group of chars in a string"
-    match = REPEATER.match(s)
-    return match.group(1) if match else None
-    
 #######################################
 # MAIN
 #######################################
 
+# Rank each line by the fraction of its 16 byte blocks which repeat
 with open('8.txt') as infile:
-    encrypted_lines = infile.readlines()
-
-# Filter the new line char..
-encrypted_lines = [line.strip() for line in encrypted_lines]
-
-# Search for repeating blocks of cipher text
-for line in encrypted_lines:
-    for i in range(len(line)):
-        result = repeater(line[i:])
-        if result and len(result) > 1:
-                print('Detected repeating chars: {}'.format(result))
-                print('For line: {}'.format(line))
+    results = detect_ecb(infile, BLOCK_SIZE)
+
+for line, duplicates, ratio in results:
+    print('Detected {} repeated blocks ({:.1%})'.format(duplicates, ratio))
+    print('For line: {}'.format(line))
@@ -35,50 +35,27 @@ from it?
 # IMPORTS
 #######################################
 
-from cryptostr import bytes_to_hexstr, hexstr, xor_strings
-from binascii import a2b_base64
-from Crypto.Cipher import AES
+from blockcipher import BACKENDS
+from cbc import cbc_decrypt, cbc_encrypt
+from loaders import load_base64
+import argparse
 
 #######################################
-# FUNCTIONS
+# MAIN
 #######################################
-def cbc_mode_encrypt(aes_ecb_obj, plain, keylen, iv):
-    "Implement CBC mode encryption. plain and iv are byte strings"
-    hexstr_iv = bytes_to_hexstr(iv)
-    hexstr_plain = bytes_to_hexstr(plain)
-    result = ''
-    # Converting bytes to hexstr doubles the length of the string..
-    start, end = 0, keylen * 2
-    for block in range(len(hexstr_plain) // keylen // 2):
-        if block == 0:
-            cipher = hexstr_iv
-            continue
-        else:
-            xor_result = xor_strings(hexstr_plain[start:end], cipher)
-            cipher = aes_ecb_obj.encrypt(xor_result)
-            result += bytes_to_hexstr(cipher)
-            start, end = end, (end + (keylen * 2))
-    return result
-
-def cbc_mode_decrypt(aes_ecb_obj, message, keylen, iv):
-    "Implement CBC mode decryption. message and iv are byte strings"
-    hexstr_iv = bytes_to_hexstr(iv)
-    start, end = 0, keylen
-    for block in range(len(message) // keylen):
-        encrypted
-        start, end = end, end + keylen
 
+parser = argparse.ArgumentParser(description='Implement CBC mode')
+parser.add_argument('--backend', choices=BACKENDS, default='auto')
+args = parser.parse_args()
+new_cipher = BACKENDS[args.backend]
 
-#######################################
-# MAIN
-#######################################
+encrypted = load_base64('10.txt')
 
-with open('10.txt') as infile:
-    encrypted = a2b_base64(infile.read())
+key = b'YELLOW SUBMARINE'
+iv = b'\x00' * len(key)
+decrypted = cbc_decrypt(key, encrypted, iv, new_cipher=new_cipher)
+print(decrypted.decode('utf-8'))
 
-key = 'YELLOW SUBMARINE'
-keylen = len(key)
-iv = b'\x00' * keylen
-aes_ecb_obj = AES.new(key, AES.MODE_ECB)
-cbc_result = cbc_mode_encrypt(aes_ecb_obj, encrypted, keylen, iv)
-print(cbc_result)
+# Encrypt what we decrypted, to check we get the original back
+reencrypted = cbc_encrypt(key, decrypted, iv, new_cipher=new_cipher)
+print('Round trip matches: {}'.format(reencrypted == encrypted))
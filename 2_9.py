@@ -27,27 +27,22 @@ bytes of padding to the end of the block. For instance,
 # IMPORTS
 #######################################
 
-from binascii import a2b_qp
-import sys
+from pkcs7 import pad
 
 #######################################
 # FUNCTIONS
 #######################################
 
 def pad_message(message, block_size):
-    "Pad message to be block_size"
-    fill = block_size - len(message)
-    bytes_str = message.encode('utf-8')
-    for _ in range(fill):
-        bytes_str += fill.to_bytes(1, byteorder=sys.byteorder)
-    return bytes_str.decode('utf-8')
+    "Pad a bytes message to a multiple of block_size with PKCS#7"
+    return pad(message, block_size)
 
 #######################################
 # MAIN
 #######################################
 
-message = 'YELLOW SUBMARINE'
+message = b'YELLOW SUBMARINE'
 block_size = 20
 padded = pad_message(message, block_size)
 print('Original: {} ({})\nPadded: {} ({})'.format(message, len(message),
-                                                  a2b_qp(padded), len(padded)))
+                                                  padded, len(padded)))
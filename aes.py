@@ -0,0 +1,251 @@
+#!/usr/bin/python3
+
+"""
+aes.py
+
+A self-contained, table driven AES-128/192/256 block cipher (FIPS-197).
+
+Each AES round is SubBytes, ShiftRows, MixColumns and AddRoundKey. For a
+32 bit column these collapse into four lookups in precomputed T-tables
+xor'd with the round key, the standard fast software implementation:
+
+    t0 = Te0[s0 >> 24] ^ Te1[s1 >> 16 & 0xff] ^ Te2[s2 >> 8 & 0xff]
+         ^ Te3[s3 & 0xff] ^ rk
+
+Decryption uses the equivalent inverse cipher with the Td tables, so it
+has the same shape. The S-box and tables are computed at import time
+from the GF(2^8) arithmetic rather than pasted in.
+
+AES objects have bulk ECB encrypt and decrypt methods, so they plug in
+anywhere a pycryptodome ECB cipher does (see blockcipher.py). Blocks are
+independent in ECB (and in CBC decryption), so with NumPy installed a
+batch of blocks is processed as four uint32 column arrays, one table
+lookup per column per round for the whole batch. The per-block
+interpreter overhead then no longer grows with the batch size. Without
+NumPy, or for small batches, blocks go through a plain Python loop.
+"""
+
+import struct
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+BLOCK_SIZE = 16
+KEY_SIZES = (16, 24, 32)
+# Below this many blocks the Python loop beats NumPy's per call overhead
+NUMPY_MIN_BLOCKS = 32
+
+#######################################
+# TABLES
+#######################################
+
+def _xtime(a):
+    """Multiply by x (i.e. 2) in GF(2^8)."""
+    a <<= 1
+    return a ^ 0x11b if a & 0x100 else a
+
+def _mul(a, b):
+    """Multiply two elements of GF(2^8)."""
+    result = 0
+    while b:
+        if b & 1:
+            result ^= a
+        a = _xtime(a)
+        b >>= 1
+    return result
+
+def _rotl8(x, shift):
+    return (x << shift | x >> (8 - shift)) & 0xff
+
+def _ror32(x, shift):
+    return (x >> shift | x << (32 - shift)) & 0xffffffff
+
+def _sboxes():
+    """The S-box and its inverse.
+
+    The S-box is the multiplicative inverse in GF(2^8), found from exp
+    and log tables of the generator 3, then an affine map.
+    """
+    exp = [0] * 255
+    log = [0] * 256
+    x = 1
+    for i in range(255):
+        exp[i] = x
+        log[x] = i
+        x ^= _xtime(x)
+    sbox = [0] * 256
+    inverse = [0] * 256
+    for a in range(256):
+        x = exp[(255 - log[a]) % 255] if a else 0
+        s = (x ^ _rotl8(x, 1) ^ _rotl8(x, 2) ^ _rotl8(x, 3) ^ _rotl8(x, 4)
+             ^ 0x63)
+        sbox[a] = s
+        inverse[s] = a
+    return sbox, inverse
+
+SBOX, INV_SBOX = _sboxes()
+
+def _column(a, b, c, d):
+    return a << 24 | b << 16 | c << 8 | d
+
+TE0 = [_column(_mul(s, 2), s, s, _mul(s, 3)) for s in SBOX]
+TD0 = [_column(_mul(s, 14), _mul(s, 9), _mul(s, 13), _mul(s, 11))
+       for s in INV_SBOX]
+TE = [[_ror32(t, 8 * i) for t in TE0] for i in range(4)]
+TD = [[_ror32(t, 8 * i) for t in TD0] for i in range(4)]
+# Final round tables, the (inverse) S-box shifted into each byte position
+SE = [[s << 8 * (3 - i) for s in SBOX] for i in range(4)]
+SD = [[s << 8 * (3 - i) for s in INV_SBOX] for i in range(4)]
+
+RCON = [1]
+while len(RCON) < 10:
+    RCON.append(_xtime(RCON[-1]))
+
+#######################################
+# KEY SCHEDULE
+#######################################
+
+def _sub_word(w):
+    return _column(SBOX[w >> 24], SBOX[w >> 16 & 0xff], SBOX[w >> 8 & 0xff],
+                   SBOX[w & 0xff])
+
+def expand_key(key):
+    """Expand a 16, 24 or 32 byte key into (rounds, round key words)."""
+    if len(key) not in KEY_SIZES:
+        raise ValueError('AES key must be 16, 24 or 32 bytes')
+    nk = len(key) // 4
+    rounds = nk + 6
+    words = list(struct.unpack('>{}I'.format(nk), key))
+    for i in range(nk, 4 * (rounds + 1)):
+        t = words[i - 1]
+        if i % nk == 0:
+            t = _sub_word(_ror32(t, 24)) ^ RCON[i // nk - 1] << 24
+        elif nk > 6 and i % nk == 4:
+            t = _sub_word(t)
+        words.append(words[i - nk] ^ t)
+    return rounds, words
+
+def _inv_mix_column(w):
+    """InvMixColumns of one word, via the Td tables."""
+    return (TD[0][SBOX[w >> 24]] ^ TD[1][SBOX[w >> 16 & 0xff]]
+            ^ TD[2][SBOX[w >> 8 & 0xff]] ^ TD[3][SBOX[w & 0xff]])
+
+def decryption_keys(rounds, words):
+    """Round keys for the equivalent inverse cipher.
+
+    The encryption round keys in reverse order, with InvMixColumns
+    applied to every round but the first and last.
+    """
+    keys = []
+    for r in range(rounds, -1, -1):
+        round_key = words[4 * r:4 * r + 4]
+        if 0 < r < rounds:
+            round_key = [_inv_mix_column(w) for w in round_key]
+        keys.extend(round_key)
+    return keys
+
+#######################################
+# CIPHER
+#######################################
+
+# Column order fed to each table by ShiftRows (encrypt) and its inverse
+_ENCRYPT_ORDER = ((0, 1, 2, 3), (1, 2, 3, 0), (2, 3, 0, 1), (3, 0, 1, 2))
+_DECRYPT_ORDER = ((0, 3, 2, 1), (1, 0, 3, 2), (2, 1, 0, 3), (3, 2, 1, 0))
+
+def _rounds_python(words, keys, rounds, tables, last, order):
+    """Run the rounds over a flat list of words, four per block."""
+    t0, t1, t2, t3 = tables
+    l0, l1, l2, l3 = last
+    (a0, b0, c0, d0), (a1, b1, c1, d1), (a2, b2, c2, d2), (a3, b3, c3, d3) = \
+        order
+    out = []
+    for start in range(0, len(words), 4):
+        s = [words[start + i] ^ keys[i] for i in range(4)]
+        k = 4
+        for _ in range(rounds - 1):
+            s = [t0[s[a0] >> 24] ^ t1[s[b0] >> 16 & 0xff]
+                 ^ t2[s[c0] >> 8 & 0xff] ^ t3[s[d0] & 0xff] ^ keys[k],
+                 t0[s[a1] >> 24] ^ t1[s[b1] >> 16 & 0xff]
+                 ^ t2[s[c1] >> 8 & 0xff] ^ t3[s[d1] & 0xff] ^ keys[k + 1],
+                 t0[s[a2] >> 24] ^ t1[s[b2] >> 16 & 0xff]
+                 ^ t2[s[c2] >> 8 & 0xff] ^ t3[s[d2] & 0xff] ^ keys[k + 2],
+                 t0[s[a3] >> 24] ^ t1[s[b3] >> 16 & 0xff]
+                 ^ t2[s[c3] >> 8 & 0xff] ^ t3[s[d3] & 0xff] ^ keys[k + 3]]
+            k += 4
+        for a, b, c, d in order:
+            out.append(l0[s[a] >> 24] ^ l1[s[b] >> 16 & 0xff]
+                       ^ l2[s[c] >> 8 & 0xff] ^ l3[s[d] & 0xff] ^ keys[k])
+            k += 1
+    return out
+
+def _rounds_numpy(columns, keys, rounds, tables, last, order):
+    """Run the rounds over four uint32 column arrays, one per word."""
+    k = 4
+    s = [columns[i] ^ keys[i] for i in range(4)]
+    for r in range(rounds):
+        t0, t1, t2, t3 = tables if r < rounds - 1 else last
+        s = [t0[s[a] >> 24] ^ t1[s[b] >> 16 & 0xff] ^ t2[s[c] >> 8 & 0xff]
+             ^ t3[s[d] & 0xff] ^ keys[k + i]
+             for i, (a, b, c, d) in enumerate(order)]
+        k += 4
+    return s
+
+
+class AES():
+    """AES in ECB mode over whole buffers of blocks.
+
+    Has the same encrypt and decrypt interface as a pycryptodome ECB
+    cipher object.
+    """
+
+    block_size = BLOCK_SIZE
+
+    def __init__(self, key):
+        key = bytes(key)
+        self.rounds, self._encrypt_keys = expand_key(key)
+        self._decrypt_keys = decryption_keys(self.rounds, self._encrypt_keys)
+        if numpy is not None:
+            self._numpy_keys = (
+                numpy.array(self._encrypt_keys, dtype=numpy.uint32),
+                numpy.array(self._decrypt_keys, dtype=numpy.uint32))
+
+    def _crypt(self, data, decrypt):
+        if len(data) % BLOCK_SIZE:
+            raise ValueError('Data must be a multiple of {} bytes'.format(
+                             BLOCK_SIZE))
+        blocks = len(data) // BLOCK_SIZE
+        tables, last, order = ((TD, SD, _DECRYPT_ORDER) if decrypt else
+                               (TE, SE, _ENCRYPT_ORDER))
+        if numpy is not None and blocks >= NUMPY_MIN_BLOCKS:
+            keys = self._numpy_keys[decrypt]
+            words = numpy.frombuffer(data, dtype='>u4').astype(numpy.uint32)
+            columns = words.reshape(blocks, 4).T
+            out = _rounds_numpy(columns, keys, self.rounds,
+                                _NUMPY_TABLES[decrypt],
+                                _NUMPY_LAST[decrypt], order)
+            return numpy.stack(out, axis=1).astype('>u4').tobytes()
+        keys = self._decrypt_keys if decrypt else self._encrypt_keys
+        words = struct.unpack('>{}I'.format(4 * blocks), data)
+        out = _rounds_python(words, keys, self.rounds, tables, last, order)
+        return struct.pack('>{}I'.format(4 * blocks), *out)
+
+    def encrypt(self, data):
+        """ECB encrypt a bytes-like buffer of whole blocks."""
+        return self._crypt(data, False)
+
+    def decrypt(self, data):
+        """ECB decrypt a bytes-like buffer of whole blocks."""
+        return self._crypt(data, True)
+
+
+if numpy is not None:
+    _NUMPY_TABLES = [[numpy.array(t, dtype=numpy.uint32) for t in tables]
+                     for tables in (TE, TD)]
+    _NUMPY_LAST = [[numpy.array(t, dtype=numpy.uint32) for t in tables]
+                   for tables in (SE, SD)]
+
+def new(key):
+    """Return an AES ECB cipher object for key."""
+    return AES(key)
@@ -0,0 +1,285 @@
+#!/usr/bin/python3
+
+"""
+bench.py
+
+Benchmarks for the hot paths of the challenges, with a tracked baseline.
+
+Each benchmark runs on the bundled challenge data ('data') and optionally
+on synthetic inputs scaled to '1MB' and '100MB'. Each run loops the
+benchmark enough times to take at least 0.2s (timeit's autorange), so
+fast paths are not lost in timer noise. The best per-call time of
+--repeat runs is recorded per benchmark and size, and compared to the
+baseline JSON file; anything slower than the baseline by more than
+--threshold is flagged as a regression (and the exit status is 1).
+
+Usage:
+    bench.py [--sizes data,1MB,100MB] [--only NAME,...] [--repeat N]
+             [--threshold 0.2] [--baseline bench_baseline.json] [--save]
+
+Some of the older string based paths are quadratic, so benchmarks can
+cap the size they will run at and are reported as skipped above it.
+"""
+
+#######################################
+# IMPORTS
+#######################################
+
+from binascii import a2b_base64, hexlify
+from importlib import import_module
+import argparse
+import json
+import random
+import sys
+import timeit
+
+#######################################
+# DEFINES
+#######################################
+
+SIZES = {'data': None, '1MB': 1 << 20, '100MB': 100 << 20}
+DEFAULT_SIZES = 'data'
+BASELINE = 'bench_baseline.json'
+THRESHOLD = 0.2
+REPEAT = 5
+LINE_BYTES = 30
+
+BENCHMARKS = {}
+
+#######################################
+# INPUTS
+#######################################
+
+def benchmark(name, max_size=None):
+    """Register setup(size) -> callable as a benchmark.
+
+    size is None for the bundled data, otherwise a byte count for
+    synthetic input. Returns the callable to be timed.
+    """
+    def register(setup):
+        BENCHMARKS[name] = (setup, max_size)
+        return setup
+    return register
+
+def read_base64(filename):
+    with open(filename) as infile:
+        return a2b_base64(infile.read())
+
+def read_lines(filename):
+    with open(filename) as infile:
+        return [line.strip() for line in infile]
+
+def synthetic_bytes(size):
+    "Deterministic random bytes"
+    return random.Random(size).randbytes(size)
+
+def synthetic_text(size):
+    "Deterministic English-like text, repeating-key xor'd when encrypted"
+    text = read_base64('6.txt')
+    from repxor import repeating_xor
+    plain = repeating_xor(text, b'Terminator X: Bring the noise')
+    return (plain * (size // len(plain) + 1))[:size]
+
+def synthetic_lines(size, line_bytes=LINE_BYTES):
+    "Deterministic random hex lines, size bytes before hex encoding"
+    data = synthetic_bytes(size)
+    return [hexlify(data[i:i + line_bytes]).decode('utf-8')
+            for i in range(0, len(data), line_bytes)]
+
+def data_or_text(size):
+    return read_base64('6.txt') if size is None else synthetic_text(size)
+
+#######################################
+# BENCHMARKS
+#######################################
+
+@benchmark('hexstr_construct')
+def _hexstr_construct(size):
+    from hexstr import Hexstr
+    value = hexlify(data_or_text(size)).decode('utf-8')
+    return lambda: Hexstr(value)
+
+@benchmark('hexstr_xor')
+def _hexstr_xor(size):
+    from hexstr import Hexstr
+    data = data_or_text(size)
+    x, y = Hexstr(data), Hexstr(bytes(reversed(data)))
+    return lambda: x ^ y
+
+@benchmark('xor_strings', max_size=1 << 16)
+def _xor_strings(size):
+    from cryptostr import xor_strings
+    data = data_or_text(size)
+    xs = hexlify(data).decode('utf-8')
+    ys = hexlify(bytes(reversed(data))).decode('utf-8')
+    return lambda: xor_strings(xs, ys)
+
+@benchmark('hamming_distance', max_size=1 << 20)
+def _hamming_distance(size):
+    from cryptostr import hamming_distance
+    data = data_or_text(size).decode('latin-1')
+    return lambda: hamming_distance(data, data[::-1])
+
+@benchmark('chi_squared')
+def _chi_squared(size):
+    from freqy import chi_squared
+    data = data_or_text(size).decode('latin-1')
+    return lambda: chi_squared(data)
+
+@benchmark('break_single')
+def _break_single(size):
+    from hexstr import Hexstr
+    bruteforce_xor = import_module('1_3').bruteforce_xor
+    if size is None:
+        data = bytes.fromhex('1b37373331363f78151b7f2b783431333d78397828372d'
+                             '363c78373e783a393b3736')
+    else:
+        data = bytes(b ^ 0x58 for b in synthetic_text(size))
+    message = Hexstr(data)
+    return lambda: bruteforce_xor(message)
+
+@benchmark('scan_4txt')
+def _scan_4txt(size):
+    from xordetect import detect
+    lines = read_lines('4.txt') if size is None else synthetic_lines(size)
+    return lambda: detect(lines, workers=1)
+
+@benchmark('keysize')
+def _keysize(size):
+    from repxor import estimate_keysize
+    data = data_or_text(size)
+    return lambda: estimate_keysize(data)
+
+@benchmark('break_repeating')
+def _break_repeating(size):
+    from repxor import break_repeating_xor
+    data = data_or_text(size)
+    return lambda: break_repeating_xor(data)
+
+def data_or_blocks(size):
+    "The challenge 7 ciphertext, or random bytes cut to whole blocks"
+    data = read_base64('7.txt') if size is None else synthetic_bytes(size)
+    return data[:len(data) - len(data) % 16]
+
+@benchmark('aes_ecb_pycryptodome')
+def _aes_ecb_pycryptodome(size):
+    from blockcipher import pycryptodome_aes_ecb
+    data = data_or_blocks(size)
+    cipher = pycryptodome_aes_ecb(b'YELLOW SUBMARINE')
+    return lambda: cipher.decrypt(data)
+
+@benchmark('aes_ecb_pure', max_size=1 << 20)
+def _aes_ecb_pure(size):
+    from blockcipher import pure_aes_ecb
+    data = data_or_blocks(size)
+    cipher = pure_aes_ecb(b'YELLOW SUBMARINE')
+    return lambda: cipher.decrypt(data)
+
+@benchmark('cbc_decrypt_pure', max_size=1 << 20)
+def _cbc_decrypt_pure(size):
+    from blockcipher import pure_aes_ecb
+    from cbc import cbc_decrypt
+    data = data_or_blocks(size)
+    return lambda: cbc_decrypt(b'YELLOW SUBMARINE', data, bytes(16),
+                               new_cipher=pure_aes_ecb)
+
+@benchmark('detect_ecb')
+def _detect_ecb(size):
+    from ecbdetect import detect_ecb
+    lines = (read_lines('8.txt') if size is None 
+             else synthetic_lines(size, line_bytes=160))
+    return lambda: detect_ecb(lines)
+
+#######################################
+# FUNCTIONS
+#######################################
+
+def time_call(func, repeat=REPEAT):
+    """Best seconds per call of func over repeat runs.
+
+    Each run calls func as many times as autorange picks (1, 2, 5, 10,
+    20, ...) for it to last at least 0.2s.
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+def run(names, sizes, repeat=REPEAT):
+    """Time each benchmark at each size, returning {key: seconds}."""
+    results = {}
+    for name in names:
+        setup, max_size = BENCHMARKS[name]
+        for label in sizes:
+            size = SIZES[label]
+            key = '{}[{}]'.format(name, label)
+            if size is not None and max_size is not None and size > max_size:
+                print('{:<32} skipped (max {} bytes)'.format(key, max_size))
+                continue
+            try:
+                func = setup(size)
+            except ImportError as error:
+                print('{:<32} skipped ({})'.format(key, error))
+                continue
+            results[key] = time_call(func, repeat)
+            print('{:<32} {:>12.6f}s'.format(key, results[key]))
+    return results
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """Return [(key, old, new)] for results slower than baseline."""
+    regressions = []
+    for key, new in sorted(results.items()):
+        old = baseline.get(key)
+        if old and new > old * (1 + threshold):
+            regressions.append((key, old, new))
+    return regressions
+
+def load_baseline(filename):
+    try:
+        with open(filename) as infile:
+            return json.load(infile)
+    except FileNotFoundError:
+        return {}
+
+#######################################
+# MAIN
+#######################################
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the hot paths')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help='comma separated, from: ' + ', '.join(SIZES))
+    parser.add_argument('--only', default=None,
+                        help='comma separated benchmark names')
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save', action='store_true',
+                        help='merge these results into the baseline')
+    args = parser.parse_args(argv)
+
+    names = args.only.split(',') if args.only else list(BENCHMARKS)
+    sizes = args.sizes.split(',')
+    for name in names:
+        if name not in BENCHMARKS:
+            parser.error('unknown benchmark: {}'.format(name))
+    for label in sizes:
+        if label not in SIZES:
+            parser.error('unknown size: {}'.format(label))
+
+    results = run(names, sizes, args.repeat)
+    baseline = load_baseline(args.baseline)
+    regressions = compare(results, baseline, args.threshold)
+    for key, old, new in regressions:
+        print('REGRESSION {}: {:.6f}s -> {:.6f}s ({:+.0%})'.format(
+              key, old, new, new / old - 1))
+
+    if args.save:
+        baseline.update(results)
+        with open(args.baseline, 'w') as outfile:
+            json.dump(baseline, outfile, indent=4, sort_keys=True)
+            outfile.write('\n')
+        print('Saved {} results to {}'.format(len(results), args.baseline))
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+
+"""
+blockcipher.py
+
+One entry point for the ECB block cipher primitive under every mode.
+
+Expanding a key schedule costs far more than encrypting a block, so
+get_cipher keeps the most recently used BlockCipher objects in an LRU
+cache keyed by key bytes (and cipher factory). Code which re-creates
+ciphers in a loop, such as streaming CBC a chunk at a time or an oracle
+answering queries, expands each key once.
+
+BlockCipher works on many blocks per call: encrypt_blocks and
+decrypt_blocks take any bytes-like buffer of whole blocks (a memoryview
+slice of a larger buffer works) and return one bytes buffer, so the
+per-block cost stays inside the underlying cipher.
+
+Ciphers are created with new_cipher(key), which must return an object
+with ECB encrypt and decrypt methods. It defaults to AES from
+pycryptodome, falling back to the pure Python aes.py when it is not
+installed. BACKENDS names the AES choices for command line switches.
+"""
+
+from functools import lru_cache
+
+BLOCK_SIZE = 16
+CACHE_SIZE = 256
+
+
+def pycryptodome_aes_ecb(key):
+    """Return a pycryptodome AES cipher object in ECB mode."""
+    from Crypto.Cipher import AES
+    return AES.new(key, AES.MODE_ECB)
+
+def pure_aes_ecb(key):
+    """Return a pure Python (table driven) AES cipher object."""
+    import aes
+    return aes.new(key)
+
+def aes_ecb(key):
+    """Return an AES ECB cipher object, pycryptodome if installed."""
+    try:
+        return pycryptodome_aes_ecb(key)
+    except ImportError:
+        return pure_aes_ecb(key)
+
+BACKENDS = {'auto': aes_ecb,
+            'pycryptodome': pycryptodome_aes_ecb,
+            'pure': pure_aes_ecb}
+
+
+class BlockCipher():
+    """A keyed ECB block cipher with bulk block methods."""
+
+    __slots__ = ('key', 'block_size', '_ecb')
+
+    def __init__(self, key, block_size=BLOCK_SIZE, new_cipher=aes_ecb):
+        self.key = bytes(key)
+        self.block_size = block_size
+        self._ecb = new_cipher(self.key)
+
+    def _check(self, data):
+        if len(data) % self.block_size:
+            raise ValueError('Data must be a multiple of {} bytes, '
+                             'pad it first'.format(self.block_size))
+
+    def encrypt_blocks(self, data):
+        """ECB encrypt a bytes-like buffer of whole blocks."""
+        self._check(data)
+        return self._ecb.encrypt(data)
+
+    def decrypt_blocks(self, data):
+        """ECB decrypt a bytes-like buffer of whole blocks."""
+        self._check(data)
+        return self._ecb.decrypt(data)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _cached_cipher(key, block_size, new_cipher):
+    return BlockCipher(key, block_size, new_cipher)
+
+def get_cipher(key, block_size=BLOCK_SIZE, new_cipher=aes_ecb):
+    """Return the (cached) BlockCipher for key."""
+    return _cached_cipher(bytes(key), block_size, new_cipher)
+
+def cache_info():
+    """Hits, misses and size of the cipher cache."""
+    return _cached_cipher.cache_info()
+
+def clear_cache():
+    _cached_cipher.cache_clear()
@@ -18,6 +18,7 @@ the one with the best score.
 """
 
 from binascii import hexlify, unhexlify
+from wordindex import WordIndex
 import sys
 
 def is_english_word(word, wordset):
@@ -34,10 +35,9 @@ def is_english_phrase(phrase, wordset):
 
 def get_wordset():
     "Attempt to open the default english wordlist I downloaded from some random git"
-    # Create a set of English words for later scoring
-    with open("./english-words/words.txt") as word_file:
-        english_words = set(word.strip().lower() for word in word_file)
-    return english_words
+    # Memory-mapped index of English words for later scoring, built the
+    # first time and whenever words.txt changes
+    return WordIndex()
 
 def xor_strings(xs, ys):
     """
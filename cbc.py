@@ -0,0 +1,88 @@
+#!/usr/bin/python3
+
+"""
+cbc.py
+
+CBC mode built by hand on top of an ECB block cipher primitive.
+
+Encryption is inherently serial: each plaintext block is xor'd with the
+previous ciphertext block before it is encrypted. Decryption is not,
+since plaintext block i only depends on ciphertext blocks i and i - 1:
+
+    P[i] = D(C[i]) ^ C[i - 1],  with C[-1] = IV
+
+So the whole ciphertext is ECB decrypted in one bulk call (or split
+across a process pool for huge inputs) and then xor'd against the
+ciphertext shifted by one block in a single wide operation.
+
+Ciphers come from blockcipher.get_cipher, so a key is only expanded
+once however many times it is used. new_cipher(key) must return an
+object with ECB encrypt and decrypt methods, it defaults to AES.
+"""
+
+from blockcipher import aes_ecb, get_cipher, BLOCK_SIZE
+from concurrent.futures import ProcessPoolExecutor
+
+PARALLEL_CHUNK = 1 << 22
+
+def xor_bytes(xs, ys):
+    """xor two equal length bytes-like objects as one wide integer."""
+    if len(xs) != len(ys):
+        raise ValueError('Can only xor equal lengths, got {} and {}'.format(
+                         len(xs), len(ys)))
+    x = int.from_bytes(xs, 'big') ^ int.from_bytes(ys, 'big')
+    return x.to_bytes(len(xs), 'big')
+
+def _check_length(data, iv, block_size):
+    if len(iv) != block_size:
+        raise ValueError('IV must be {} bytes'.format(block_size))
+    if len(data) % block_size:
+        raise ValueError('Data must be a multiple of {} bytes, '
+                         'pad it first'.format(block_size))
+
+def cbc_encrypt(key, plain, iv, block_size=BLOCK_SIZE, new_cipher=aes_ecb):
+    """CBC encrypt plain (bytes-like, already padded) under key and iv."""
+    _check_length(plain, iv, block_size)
+    ecb = get_cipher(key, block_size, new_cipher)
+    plain = memoryview(plain).cast('B')
+    result = bytearray(len(plain))
+    previous = bytes(iv)
+    for start in range(0, len(plain), block_size):
+        end = start + block_size
+        previous = ecb.encrypt_blocks(xor_bytes(plain[start:end], previous))
+        result[start:end] = previous
+    return bytes(result)
+
+def _ecb_decrypt(new_cipher, key, block_size, data):
+    """Bulk ECB decrypt, run in worker processes."""
+    return get_cipher(key, block_size, new_cipher).decrypt_blocks(data)
+
+def cbc_decrypt(key, cipher, iv, block_size=BLOCK_SIZE, new_cipher=aes_ecb,
+                workers=1, chunk_size=PARALLEL_CHUNK):
+    """CBC decrypt cipher (bytes-like) under key and iv.
+
+    All blocks are ECB decrypted in one call into a preallocated buffer,
+    or with workers > 1, in chunk_size pieces across a process pool
+    (new_cipher must then be picklable, i.e. a module level function).
+    """
+    _check_length(cipher, iv, block_size)
+    if not cipher:
+        return b''
+    cipher = bytes(cipher)
+    decrypted = bytearray(len(cipher))
+    if workers > 1 and len(cipher) > chunk_size:
+        # Whole blocks per chunk, and at least one
+        chunk_size = max(block_size, chunk_size - chunk_size % block_size)
+        starts = range(0, len(cipher), chunk_size)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = pool.map(_ecb_decrypt, [new_cipher] * len(starts),
+                              [key] * len(starts), [block_size] * len(starts),
+                              (cipher[s:s + chunk_size] for s in starts))
+            for start, chunk in zip(starts, chunks):
+                decrypted[start:start + len(chunk)] = chunk
+    else:
+        decrypted[:] = get_cipher(key, block_size,
+                                  new_cipher).decrypt_blocks(cipher)
+    # xor every block against the previous ciphertext block in one go
+    shifted = bytes(iv) + cipher[:-block_size]
+    return xor_bytes(decrypted, shifted)
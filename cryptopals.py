@@ -0,0 +1,297 @@
+#!/usr/bin/python3
+
+"""
+cryptopals.py
+
+One command line for the challenge tools, with a subcommand per attack:
+
+    break-single     break single-byte XOR hex strings (1_3)
+    detect-single    find single-byte XOR lines in files (1_4)
+    break-repeating  break repeating-key XOR files (1_6)
+    detect-ecb       find ECB encrypted lines in files (1_8)
+    ecb              AES-ECB encrypt or decrypt files (1_7)
+    cbc              AES-CBC encrypt or decrypt files (2_10)
+
+Every subcommand takes any number of input files ('-' or none for
+stdin), so many ciphertexts are handled by one interpreter. Modules a
+subcommand needs, AES and friends included, are only imported when that
+subcommand runs, so startup stays fast.
+
+Examples:
+    cryptopals.py detect-single 4.txt
+    cryptopals.py break-repeating 6.txt
+    cryptopals.py ecb -d --key 'YELLOW SUBMARINE' --base64 7.txt
+    cat lines*.txt | cryptopals.py detect-ecb
+"""
+
+#######################################
+# IMPORTS
+#######################################
+
+import argparse
+import sys
+
+#######################################
+# FUNCTIONS
+#######################################
+
+def open_inputs(paths, mode='r'):
+    """Yield (name, file object) for each path, '-' meaning stdin."""
+    for path in paths or ['-']:
+        if path == '-':
+            yield '<stdin>', sys.stdin if mode == 'r' else sys.stdin.buffer
+        else:
+            with open(path, mode) as infile:
+                yield path, infile
+
+def input_lines(paths):
+    """Yield the stripped, non-empty lines of every input."""
+    for _, infile in open_inputs(paths):
+        for line in infile:
+            line = line.strip()
+            if line:
+                yield line
+
+def parse_bytes(value, is_hex):
+    """Turn a --key/--iv argument into bytes."""
+    return bytes.fromhex(value) if is_hex else value.encode('utf-8')
+
+def printable(data):
+    return data.decode('utf-8', errors='backslashreplace')
+
+def open_cache(args):
+    """Open the result cache unless --no-cache, clearing it if asked."""
+    if args.no_cache:
+        return None
+    from resultcache import ResultCache
+    cache = ResultCache()
+    if args.clear_cache:
+        cache.clear()
+    return cache
+
+#######################################
+# SUBCOMMANDS
+#######################################
+
+def break_single(args):
+    from xordetect import rank_keys, CACHE_KIND, RANKED_KEYS
+    if args.ngram:
+        from ngram import get_model
+        english = get_model()
+    cache = open_cache(args) if args.top <= RANKED_KEYS else None
+    status = 0
+    for line in input_lines(args.inputs):
+        try:
+            data = bytes.fromhex(line)
+        except ValueError:
+            print('Skipping invalid hex line: {}'.format(line),
+                  file=sys.stderr)
+            status = 1
+            continue
+        if args.ngram:
+            ranked = [english.score_keys(data)]
+        elif cache is not None:
+            ranked = cache.cached(CACHE_KIND, data, rank_keys)
+        else:
+            ranked = rank_keys(data, args.top)
+        print(line)
+        for key, score in ranked[:args.top]:
+            plain = bytes(b ^ key for b in data)
+            print('    (0x{:02x}) {:.2f}: {!r}'.format(key, score, plain))
+    return status
+
+def detect_single(args):
+    from xordetect import detect
+    results = detect(input_lines(args.inputs), args.top,
+                     workers=args.workers, cache=open_cache(args),
+                     prune=not args.no_prune)
+    for line, key, score in results:
+        plain = bytes(b ^ key for b in bytes.fromhex(line))
+        print('(0x{:02x}) {:.2f}: {}'.format(key, score, line))
+        print('    {!r}'.format(plain))
+
+def track_single(args):
+    from keytracker import KeyTracker
+    from pipeline import read_chunks
+    for name, infile in open_inputs(args.inputs, 'rb'):
+        tracker = KeyTracker(args.model, args.confidence)
+        # Hold the stream back only until the key settles
+        held = []
+        for chunk in read_chunks(infile, args.chunk_size):
+            if tracker.stable:
+                sys.stdout.buffer.write(tracker.decrypt(chunk))
+                continue
+            held.append(chunk)
+            if tracker.update(chunk):
+                print('{}: key 0x{:02x} stable after {} bytes ({:.4f})'.format(
+                      name, tracker.key, tracker.length, tracker.confidence),
+                      file=sys.stderr)
+                sys.stdout.buffer.write(tracker.decrypt(b''.join(held)))
+                held = []
+        if held and tracker.key is not None:
+            print('{}: key 0x{:02x} never stabilised ({:.4f})'.format(
+                  name, tracker.key, tracker.confidence), file=sys.stderr)
+            sys.stdout.buffer.write(tracker.decrypt(b''.join(held)))
+        sys.stdout.buffer.flush()
+
+def load_input(name, infile, is_hex):
+    """Decode a whole base64 (or hex) input, memory-mapping files."""
+    from binascii import a2b_base64
+    import loaders
+    if name != '<stdin>':
+        return (loaders.load_hex if is_hex else loaders.load_base64)(name)
+    text = infile.read()
+    return bytes.fromhex(text) if is_hex else a2b_base64(text)
+
+def break_repeating(args):
+    from repxor import beam_search, break_repeating_xor
+    cache = open_cache(args)
+    status = 0
+    for name, infile in open_inputs(args.inputs):
+        data = load_input(name, infile, args.hex)
+        try:
+            if args.keysize or args.beam < 2:
+                key, plain = break_repeating_xor(data, args.keysize, cache,
+                                                 args.model)
+                print('{}: key {!r}'.format(name, key))
+            else:
+                key, plain, margin = beam_search(data, args.beam,
+                                                 args.workers, cache,
+                                                 args.model)
+                print('{}: key {!r} (margin {})'.format(name, key, margin))
+        except ValueError as error:
+            print('{}: {}'.format(name, error), file=sys.stderr)
+            status = 1
+            continue
+        if not args.key_only:
+            print(printable(plain))
+    return status
+
+def detect_ecb(args):
+    from ecbdetect import detect_ecb
+    for line, duplicates, ratio in detect_ecb(input_lines(args.inputs),
+                                              args.block_size, args.top):
+        print('{} repeated blocks ({:.1%}): {}'.format(duplicates, ratio, line))
+
+def block_mode(args):
+    from binascii import a2b_base64
+    from blockcipher import BACKENDS
+    from loaders import iter_base64
+    from pipeline import decrypt_chunks, encrypt_chunks, read_chunks
+    new_cipher = BACKENDS[args.backend]
+    key = parse_bytes(args.key, args.hex)
+    iv = None
+    if args.mode == 'cbc':
+        iv = parse_bytes(args.iv, args.hex) if args.iv else bytes(len(key))
+    crypt = decrypt_chunks if args.decrypt else encrypt_chunks
+    for name, infile in open_inputs(args.inputs, 'rb'):
+        if args.base64 and name != '<stdin>':
+            chunks = iter_base64(name)
+        elif args.base64:
+            chunks = [a2b_base64(infile.read())]
+        else:
+            chunks = read_chunks(infile)
+        if args.suffix and name != '<stdin>':
+            with open(name + args.suffix, 'wb') as outfile:
+                for chunk in crypt(chunks, key, iv, new_cipher=new_cipher):
+                    outfile.write(chunk)
+        else:
+            for chunk in crypt(chunks, key, iv, new_cipher=new_cipher):
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+
+#######################################
+# MAIN
+#######################################
+
+def build_parser():
+    from blockcipher import BACKENDS
+    parser = argparse.ArgumentParser(description='cryptopals challenge tools')
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    commands.required = True
+
+    def command(name, func, help):
+        sub = commands.add_parser(name, help=help, description=help)
+        sub.add_argument('inputs', nargs='*', metavar='input',
+                         help="input files, '-' or none for stdin")
+        sub.set_defaults(func=func)
+        return sub
+
+    def cache_arguments(sub):
+        sub.add_argument('--no-cache', action='store_true',
+                         help="don't read or write the result cache")
+        sub.add_argument('--clear-cache', action='store_true',
+                         help='invalidate the result cache first')
+
+    sub = command('break-single', break_single,
+                  'break single-byte XOR, one hex string per line')
+    sub.add_argument('-n', '--top', type=int, default=1)
+    sub.add_argument('--ngram', action='store_true',
+                     help='score by trigram log-likelihood, best key only')
+    cache_arguments(sub)
+
+    sub = command('detect-single', detect_single,
+                  'find the lines most likely single-byte XOR encrypted')
+    sub.add_argument('-n', '--top', type=int, default=5)
+    sub.add_argument('-w', '--workers', type=int, default=None)
+    sub.add_argument('--no-prune', action='store_true',
+                     help='score every key, not only printable ones')
+    cache_arguments(sub)
+
+    sub = command('track-single', track_single,
+                  'decrypt a single-byte XOR stream as soon as its key '
+                  'settles')
+    sub.add_argument('--chunk-size', type=int, default=4096)
+    sub.add_argument('--confidence', type=float, default=0.999)
+    sub.add_argument('--model', default=None,
+                     help='score with a frequency model trained by '
+                          'freqmodel.py')
+
+    sub = command('break-repeating', break_repeating,
+                  'break repeating-key XOR, one base64 ciphertext per file')
+    sub.add_argument('--hex', action='store_true', help='inputs are hex')
+    sub.add_argument('-k', '--keysize', type=int, default=None)
+    sub.add_argument('--beam', type=int, default=5,
+                     help='fully solve this many of the best keysizes')
+    sub.add_argument('-w', '--workers', type=int, default=1)
+    sub.add_argument('--key-only', action='store_true')
+    sub.add_argument('--model', default=None,
+                     help='score with a frequency model trained by '
+                          'freqmodel.py')
+    cache_arguments(sub)
+
+    sub = command('detect-ecb', detect_ecb,
+                  'find the hex lines most likely ECB encrypted')
+    sub.add_argument('-b', '--block-size', type=int, default=16)
+    sub.add_argument('-n', '--top', type=int, default=5)
+
+    for mode in ('ecb', 'cbc'):
+        sub = command(mode, block_mode,
+                      'AES-{} encrypt or decrypt with PKCS#7 padding'.format(
+                      mode.upper()))
+        sub.set_defaults(mode=mode)
+        group = sub.add_mutually_exclusive_group(required=True)
+        group.add_argument('-e', '--encrypt', action='store_true')
+        group.add_argument('-d', '--decrypt', action='store_true')
+        sub.add_argument('--key', required=True)
+        if mode == 'cbc':
+            sub.add_argument('--iv', default=None,
+                             help='defaults to all zero bytes')
+        sub.add_argument('--hex', action='store_true',
+                         help='--key/--iv are hex')
+        sub.add_argument('--base64', action='store_true',
+                         help='inputs are base64 encoded')
+        sub.add_argument('--suffix', default=None,
+                         help='write each input file to <input><suffix> '
+                              'instead of stdout')
+        sub.add_argument('--backend', choices=BACKENDS, default='auto',
+                         help='AES implementation, auto prefers '
+                              'pycryptodome')
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
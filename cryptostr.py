@@ -25,6 +25,9 @@ Examples:
 - hamming_distance:
     s1 = "this is a test" & s2 = "wokka wokka!!!" == 37
 
+- bytes_hamming_distance:
+    b"this is a test" & b"wokka wokka!!!" == 37
+
 - xor_strings:
     takes two strings, and xors them together
     hexstr1 = '1c0111001f010100061a024b53535009181c'
@@ -66,6 +69,15 @@ def hamming_distance(s1, s2):
     "Calculate the hamming distance between two strings"
     return sum(c1 != c2 for c1, c2 in zip(bin_string(s1), bin_string(s2)))
 
+def bytes_hamming_distance(b1, b2):
+    """Calculate the hamming distance between two equal length bytes-like.
+
+    Both buffers are xor'd as single integers and the set bits counted,
+    so this runs at C speed however long the buffers are.
+    """
+    x = int.from_bytes(b1, 'big') ^ int.from_bytes(b2, 'big')
+    return x.bit_count()
+
 def xor_strings(xs, ys):
     """
     Take two strings, xs - an encrypted hex string and 
@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+
+"""
+ecbdetect.py
+
+Detect AES (or any block cipher) in ECB mode.
+
+ECB is stateless and deterministic, so the same plaintext block always
+encrypts to the same ciphertext block. Each hex ciphertext is decoded,
+sliced into fixed size blocks through a memoryview and the repeated
+blocks counted with a set, in one pass. Lines are streamed, and only the
+top ranked ciphertexts by duplicate block ratio are kept.
+
+Usage:
+    ecbdetect.py [-b BLOCK_SIZE] [-n TOP] [infile]
+
+Reads from stdin when no infile (or '-') is given.
+"""
+
+#######################################
+# IMPORTS
+#######################################
+
+from binascii import unhexlify, Error as BinasciiError
+import argparse
+import heapq
+
+#######################################
+# DEFINES
+#######################################
+
+BLOCK_SIZE = 16
+TOP_RESULTS = 5
+
+#######################################
+# FUNCTIONS
+#######################################
+
+def duplicate_blocks(data, block_size=BLOCK_SIZE):
+    """Count blocks which repeat an earlier block in data.
+
+    Returns (duplicates, blocks). A trailing partial block is ignored.
+    """
+    view = memoryview(data)
+    blocks = len(view) // block_size
+    seen = set()
+    for start in range(0, blocks * block_size, block_size):
+        seen.add(view[start:start + block_size].tobytes())
+    return blocks - len(seen), blocks
+
+def duplicate_ratio(data, block_size=BLOCK_SIZE):
+    "Fraction of the blocks in data which repeat an earlier block"
+    duplicates, blocks = duplicate_blocks(data, block_size)
+    return duplicates / blocks if blocks else 0.0
+
+def detect_ecb(lines, block_size=BLOCK_SIZE, top=TOP_RESULTS):
+    """Rank hex ciphertexts by how likely they are to be ECB encrypted.
+
+    lines is any iterable of hex strings (a file object works). Returns
+    up to top (line, duplicates, ratio) tuples for ciphertexts with at
+    least one repeated block, highest duplicate block ratio first.
+    """
+    heap = []
+    for count, line in enumerate(lines):
+        line = line.strip()
+        try:
+            data = unhexlify(line)
+        except (BinasciiError, ValueError):
+            continue
+        duplicates, blocks = duplicate_blocks(data, block_size)
+        if not duplicates:
+            continue
+        # count breaks ties in favour of the earlier line
+        item = (duplicates / blocks, duplicates, -count, line)
+        if len(heap) < top:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+    return [(line, duplicates, ratio) for ratio, duplicates, _, line in
+            sorted(heap, reverse=True)]
+
+#######################################
+# MAIN
+#######################################
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Detect ECB encrypted lines')
+    parser.add_argument('infile', nargs='?', default='-',
+                        type=argparse.FileType('r'))
+    parser.add_argument('-b', '--block-size', type=int, default=BLOCK_SIZE)
+    parser.add_argument('-n', '--top', type=int, default=TOP_RESULTS)
+    args = parser.parse_args(argv)
+
+    for line, duplicates, ratio in detect_ecb(args.infile, args.block_size,
+                                              args.top):
+        print('{} repeated blocks ({:.1%}): {}'.format(duplicates, ratio, line))
+
+if __name__ == "__main__":
+    main()
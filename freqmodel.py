@@ -0,0 +1,227 @@
+#!/usr/bin/python3
+
+"""
+freqmodel.py
+
+Byte frequency models trained from text corpora.
+
+The corpus files are streamed in chunks and counted across a process
+pool, with at most a couple of chunks per worker in flight, so corpora of
+any size train in constant memory. Each worker counts unigrams and
+bigrams for its chunk. The pairs straddling chunk boundaries are counted
+when the chunks are merged.
+
+A model is saved as a compact binary file:
+
+    header  - magic, unigram total, bigram total
+    unigram - 256 native float32 probabilities, indexed by byte
+    bigram  - 65536 native float32 probabilities, indexed by a << 8 | b
+
+Loading memory-maps the file and casts the tables in place, so nothing
+is parsed or copied. Named models live in $CRYPTOPALS_MODEL_DIR, or
+~/.cache/cryptopals/models, as <name>.freq. freqy.get_model(name) turns
+one into a Chi-Squared scorer. model_digest(name) identifies a model's
+contents, for keying results cached against it.
+
+Usage:
+    freqmodel.py [-o NAME] [-w WORKERS] corpus [corpus ...]
+"""
+
+#######################################
+# IMPORTS
+#######################################
+
+from array import array
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from hashlib import sha256
+import argparse
+import instrument
+import math
+import mmap
+import os
+import struct
+import sys
+
+#######################################
+# DEFINES
+#######################################
+
+MAGIC = b'FREQMDL1'
+HEADER = struct.Struct('<8sQQ')
+EXTENSION = '.freq'
+MODEL_DIR = os.environ.get('CRYPTOPALS_MODEL_DIR', os.path.expanduser(
+                           '~/.cache/cryptopals/models'))
+CHUNK_SIZE = 1 << 20
+# Log probability given to bigrams never seen in training
+UNSEEN = math.log(1e-9)
+
+#######################################
+# FUNCTIONS
+#######################################
+
+def model_path(name):
+    """The file for a model name, names with a path or extension as is."""
+    if os.sep in name or name.endswith(EXTENSION):
+        return name
+    return os.path.join(MODEL_DIR, name + EXTENSION)
+
+def model_digest(name):
+    """A short hash of a model file's contents, changing when retrained."""
+    with open(model_path(name), 'rb') as infile:
+        return sha256(infile.read()).hexdigest()[:16]
+
+def count_chunk(chunk):
+    """Count the bytes and byte pairs in one chunk.
+
+    Returns (unigrams, bigrams): a 256 entry list, and a Counter keyed by
+    a << 8 | b.
+    """
+    unigrams = [0] * 256
+    for b, count in Counter(chunk).items():
+        unigrams[b] = count
+    bigrams = Counter()
+    for (a, b), count in Counter(zip(chunk, chunk[1:])).items():
+        bigrams[a << 8 | b] = count
+    return unigrams, bigrams
+
+def read_corpus(paths, chunk_size=CHUNK_SIZE):
+    """Yield (path, chunk) for each chunk_size piece of each file."""
+    for path in paths:
+        with open(path, 'rb') as infile:
+            while True:
+                chunk = infile.read(chunk_size)
+                if not chunk:
+                    break
+                yield path, chunk
+
+
+class FrequencyModel():
+    """Unigram and bigram byte probability tables."""
+
+    def __init__(self, unigram, bigram, unigram_total=0, bigram_total=0):
+        """Wrap 256 unigram and 65536 bigram probabilities (sequences)."""
+        if len(unigram) != 256 or len(bigram) != 1 << 16:
+            raise ValueError('Tables must have 256 and 65536 entries')
+        self.unigram = unigram
+        self.bigram = bigram
+        self.unigram_total = unigram_total
+        self.bigram_total = bigram_total
+
+    @classmethod
+    def from_counts(cls, unigrams, bigrams):
+        """Normalise unigram and bigram count tables to probabilities."""
+        unigram_total = sum(unigrams)
+        bigram_total = sum(bigrams)
+        return cls(array('f', (n / (unigram_total or 1) for n in unigrams)),
+                   array('f', (n / (bigram_total or 1) for n in bigrams)),
+                   unigram_total, bigram_total)
+
+    @classmethod
+    def load(cls, path):
+        """Memory-map a saved model, or a named one from MODEL_DIR."""
+        with open(model_path(path), 'rb') as infile:
+            view = memoryview(mmap.mmap(infile.fileno(), 0,
+                                        access=mmap.ACCESS_READ))
+        magic, unigram_total, bigram_total = HEADER.unpack_from(view)
+        if magic != MAGIC or len(view) != HEADER.size + 4 * (256 + (1 << 16)):
+            raise ValueError('{} is not a frequency model'.format(path))
+        tables = view[HEADER.size:].cast('f')
+        return cls(tables[:256], tables[256:], unigram_total, bigram_total)
+
+    def save(self, path):
+        """Write the model to path (or a name in MODEL_DIR)."""
+        path = model_path(path)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # Write to a temporary file and rename, so concurrent readers never
+        # see a half written model
+        tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+        with open(tmp_path, 'wb') as outfile:
+            outfile.write(HEADER.pack(MAGIC, self.unigram_total,
+                                      self.bigram_total))
+            outfile.write(array('f', self.unigram).tobytes())
+            outfile.write(array('f', self.bigram).tobytes())
+        os.replace(tmp_path, path)
+
+    def bigram_score(self, data):
+        """Mean log probability of the byte pairs in data, higher is better."""
+        pairs = Counter(zip(data, data[1:]))
+        if not pairs:
+            return UNSEEN
+        bigram = self.bigram
+        total = 0
+        for (a, b), count in pairs.items():
+            p = bigram[a << 8 | b]
+            total += count * (math.log(p) if p else UNSEEN)
+        return total / (len(data) - 1)
+
+
+def train(paths, chunk_size=CHUNK_SIZE, workers=None):
+    """Train a FrequencyModel on the corpus files in paths.
+
+    Chunks are counted in a pool of workers processes (one per CPU by
+    default, in process when workers is 1).
+    """
+    unigrams = [0] * 256
+    bigrams = array('Q', bytes(8 << 16))
+    previous = (None, b'')
+
+    def merge(counts):
+        chunk_unigrams, chunk_bigrams = counts
+        for b, count in enumerate(chunk_unigrams):
+            unigrams[b] += count
+        for pair, count in chunk_bigrams.items():
+            bigrams[pair] += count
+
+    def chunks():
+        # Count the pair across each chunk boundary within a file
+        nonlocal previous
+        for path, chunk in read_corpus(paths, chunk_size):
+            last_path, last_chunk = previous
+            if path == last_path:
+                bigrams[last_chunk[-1] << 8 | chunk[0]] += 1
+            previous = path, chunk
+            instrument.count('corpus bytes', len(chunk))
+            yield chunk
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for chunk in chunks():
+            merge(count_chunk(chunk))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for chunk in chunks():
+                pending.append(pool.submit(count_chunk, chunk))
+                if len(pending) >= workers * 2:
+                    merge(pending.popleft().result())
+            while pending:
+                merge(pending.popleft().result())
+    return FrequencyModel.from_counts(unigrams, bigrams)
+
+#######################################
+# MAIN
+#######################################
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Train a byte frequency '
+                                                 'model from text corpora')
+    parser.add_argument('corpus', nargs='+')
+    parser.add_argument('-o', '--output', default='english',
+                        help='model name, or a path ending in ' + EXTENSION)
+    parser.add_argument('-w', '--workers', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    instrument.add_arguments(parser)
+    args = parser.parse_args(argv)
+    if instrument.setup(args):
+        args.workers = 1
+
+    model = train(args.corpus, args.chunk_size, args.workers)
+    model.save(args.output)
+    top = sorted(range(256), key=model.unigram.__getitem__, reverse=True)
+    print('Saved {} ({} bytes trained), most common: {}'.format(
+          model_path(args.output), model.unigram_total,
+          bytes(top[:16])), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
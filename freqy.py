@@ -23,9 +23,19 @@ the fourth position (having already included the space) between t and a.
 A simple way of testing two distributions can be found here:
 
 https://en.wikipedia.org/wiki/Chi-squared_test
+
+The scoring functions take an optional model, the name of a byte
+frequency model trained on a real corpus by freqmodel.py, to use in
+place of the table above.
 """
 
 from collections import Counter
+import instrument
+
+# Bump whenever scores change, so cached results are not reused
+SCORER_VERSION = 2
+# Least cost of a byte with no expected frequency, however short the text
+PENALTY_FLOOR = 1000
 
 expected_freq = {'e': 12.70,
                  't': 9.06,
@@ -55,7 +65,123 @@ expected_freq = {'e': 12.70,
                  'z': 0.07,
                  ' ': 19.7,}
 
-def chi_squared(message):
+# Case fold table for raw bytes, only ascii letters are folded
+_lower = [ord(chr(b).lower()) if b < 128 else b for b in range(256)]
+
+class EnglishModel():
+    """English character frequency model compiled into byte tables.
+
+    expected_freq is compiled once into a 256 entry table indexed by byte
+    value, together with a case folding translation table, so scoring a
+    candidate is a translate, a count and a sum over the bytes present.
+    Bytes without an expected frequency (anything but letters and space)
+    are penalised dramatically, by at least PENALTY_FLOOR each.
+    """
+
+    def __init__(self, freq=expected_freq, fold=True):
+        """Compile a {char or byte: frequency} dict into byte tables.
+
+        Frequencies are normalised to probabilities, so expected counts
+        are on the same scale as the observed counts. With fold False,
+        upper case letters are scored as themselves.
+        """
+        self.fold = bytes(_lower) if fold else bytes(range(256))
+        self.expected = [None] * 256
+        total = sum(freq.values())
+        for k, v in freq.items():
+            self.expected[ord(k) if isinstance(k, str) else k] = v / total
+        self.penalty_rate = max(freq.values()) / total
+
+    @classmethod
+    def from_model(cls, model):
+        """Compile the unigram table of a freqmodel.FrequencyModel.
+
+        Every byte seen in training has an expected frequency, so there
+        is no case folding.
+        """
+        return cls({b: p for b, p in enumerate(model.unigram) if p},
+                   fold=False)
+
+    def _chi_squared(self, counts, length):
+        """Chi-Squared statistic for {folded byte: count} over length."""
+        penalty = max(PENALTY_FLOOR, (self.penalty_rate * length) ** 2)
+        total = 0
+        for b, count in counts.items():
+            e = self.expected[b]
+            if e is None:
+                total += penalty
+            else:
+                e *= length
+                total += (count - e) ** 2 / e
+        return total
+
+    def score(self, data):
+        """Calculate the Chi-Squared statistic of bytes (or str) data.
+
+        Lower is better, 0 means a perfect match.
+        """
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        instrument.count('candidates scored')
+        return self._chi_squared(Counter(data.translate(self.fold)),
+                                 len(data))
+
+    def score_many(self, candidates):
+        """Score a batch of candidates, returning a list of statistics."""
+        chi_squared = self._chi_squared
+        fold = self.fold
+        candidates = list(candidates)
+        instrument.count('candidates scored', len(candidates))
+        return [chi_squared(Counter(c.translate(fold)), len(c))
+                for c in candidates]
+
+    def score_keys(self, data, keys=None):
+        """Score data decrypted under each of the 256 single byte keys.
+
+        xor'ing with a constant byte only permutes the byte histogram, so
+        data is counted once and the score for each key is derived from
+        that histogram: byte b decrypts under key k to b ^ k. Returns a
+        list of 256 scores indexed by key. If keys is given only those
+        are scored, the rest score infinity.
+        """
+        return self.score_histogram(byte_histogram(data), keys)
+
+    def score_histogram(self, histogram, keys=None):
+        """As score_keys, from a 256 entry byte histogram of the data."""
+        keys = range(256) if keys is None else keys
+        instrument.count('keys tried', len(keys))
+        present = [(b, count) for b, count in enumerate(histogram) if count]
+        length = sum(count for _, count in present)
+        fold = self.fold
+        scores = [float('inf')] * 256
+        for key in keys:
+            counts = {}
+            for b, count in present:
+                i = fold[b ^ key]
+                counts[i] = counts.get(i, 0) + count
+            scores[key] = self._chi_squared(counts, length)
+        return scores
+
+
+english = EnglishModel()
+_models = {}
+
+def get_model(model=None):
+    """The built-in English model, or the named trained model.
+
+    Named models are loaded with freqmodel and kept for reuse. An
+    EnglishModel is passed through.
+    """
+    if model is None:
+        return english
+    if isinstance(model, EnglishModel):
+        return model
+    if model not in _models:
+        from freqmodel import FrequencyModel
+        _models[model] = EnglishModel.from_model(FrequencyModel.load(model))
+    return _models[model]
+
+def chi_squared(message, model=None):
     """Calculate the Chi-Squared statistic value.
     
     If the two distributions are identical, the chi-squared statistic is 0.
@@ -63,14 +189,32 @@ def chi_squared(message):
 
     X^2(C,E) = sum of (Ci - Ei)^2 / Ei, where i = A -> Z
     """
-    c = Counter(message.lower())
-    # Normalize the expected probabilities into counts
-    e = { k: v * len(message) for k, v in expected_freq.items() }
-    # penalise non ascii characters dramatically
-    penalty = int(max(e.values())) ** 2
-    # chi squared algo with penalty
-    return sum(((c[i] - e[i])**2 / e[i]) if i in e else penalty for i in c)
+    return get_model(model).score(message)
 
+def byte_histogram(data):
+    """Count every byte value in data, returned as a 256 entry list."""
+    histogram = [0] * 256
+    for b, count in Counter(data).items():
+        histogram[b] = count
+    return histogram
+
+def chi_squared_keys(data, keys=None, model=None):
+    """Calculate the Chi-Squared statistic for every single byte xor key.
+
+    Returns a list of 256 scores indexed by key, see EnglishModel.score_keys.
+    """
+    return get_model(model).score_keys(data, keys)
+
+def chi_squared_histogram(histogram, keys=None, model=None):
+    """As chi_squared_keys, from a 256 entry byte histogram of the data."""
+    return get_model(model).score_histogram(histogram, keys)
+
+def english_freq_match_score(message, model=None):
+    """Score how closely message matches English, higher is better.
+
+    Maps the Chi-Squared statistic into (0, 1], where 1 is a perfect match.
+    """
+    return 1 / (1 + get_model(model).score(message))
 
 if __name__ == "__main__":
     """Test the score of a random string."""
@@ -93,5 +237,5 @@ if __name__ == "__main__":
                      b"Dhhlni`'JD t'knlb'f'whric'ha'efdhi",]
 
     for test in test_strings:
-        result = chi_squared(test.decode('utf-8'))
+        result = chi_squared(test)
         print('{}: {}'.format(result, test))
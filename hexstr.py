@@ -7,77 +7,140 @@ A class representation of a hex string.
 
 Contains functions to encode, decode, xor & manipulate hexstr's
 suited for the cryptopals.com challenges.
+
+HexstrArray holds a whole file of equal length hexstrs in one buffer,
+for batch operations. It uses NumPy when it is installed, imported on
+first use so plain Hexstr users don't pay for it at startup.
 """
 
-from binascii import hexlify, unhexlify, b2a_base64 
-import string
+from binascii import hexlify, unhexlify, b2a_base64, Error as BinasciiError
+from collections import Counter
+from functools import lru_cache
+from keyprune import is_printable
 import re
 
 
+@lru_cache(maxsize=None)
+def _numpy():
+    """The numpy module, imported on first use, or None if not installed."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
 class InvalidHexstrError(ValueError):
     """Raise when hexstr is incorrect length or contains illegal chars."""
 
 
 class Hexstr():
-    """Hexstring class with conversion and crypto operations."""
+    """Hexstring class with conversion and crypto operations.
 
-    valid_hex_chars = re.compile(r'[0-9a-f]', re.IGNORECASE)
+    The raw bytes are the single source of truth. bytes, bytearray and
+    contiguous memoryview objects are held as-is without copying. The hex
+    form is only produced when `value` is read, and cached only for bytes,
+    as a mutable buffer may change underneath it.
+    """
+
+    valid_hexstr = re.compile(r'(?:[0-9a-f]{2})*', re.IGNORECASE)
     invalid_type_message = 'Hexstr class must be initialized from str, int \
                             or bytes object.'
     invalid_hexstr_message = 'Invalid hexstr -- check length and characters'
 
+    __slots__ = ('_buffer', '_value')
+
     def __init__(self, value=None):
-        """Initialize a Hexstr object from str, int or bytes."""
+        """Initialize a Hexstr object from str, int or bytes-like."""
         self.update(value)
 
     def __repr__(self):
         """Print out the hexstr value as a utf-8 string by default."""
         return self.value
 
+    def __len__(self):
+        """Length of the underlying buffer in bytes."""
+        return len(self._buffer)
+
+    def __bytes__(self):
+        return bytes(self._buffer)
+
+    @property
+    def value(self):
+        """The hexstr form of the buffer, built on first access."""
+        if self._value is not None:
+            return self._value
+        value = hexlify(self._buffer).decode('utf-8')
+        if isinstance(self._buffer, bytes):
+            self._value = value
+        return value
+
+    @property
+    def bytestr(self):
+        """The buffer as an immutable bytes object."""
+        if not isinstance(self._buffer, bytes):
+            return bytes(self._buffer)
+        return self._buffer
+
+    @property
+    def buffer(self):
+        """The underlying buffer, without copying."""
+        return self._buffer
+
     def validate_hexstr(self, hs):
         """Validate the characters and length of a hexstr."""
-        if len(hs) % 2 != 0: 
-            return False
-
-        allowed = re.compile(r'[0-9a-f]', re.IGNORECASE)
-        return all(allowed.match(x) for x in hs)
+        return self.valid_hexstr.fullmatch(hs) is not None
 
     def update(self, value):
-        """Update the Hexstr value and bytestr with a new hexstr."""
-        if isinstance(value, str): 
+        """Update the Hexstr buffer with a new value."""
+        self._value = None
+        if isinstance(value, str):
             if self.validate_hexstr(value):
-                # Already a valid hexstr
-                self.value = value
-                self.bytestr = unhexlify(value)
+                # Already a valid hexstr, keep it as given
+                self._buffer = unhexlify(value)
+                self._value = value
             else:
                 # Normal str, needs to be converted to bytestr first
-                self.bytestr = value.encode('utf-8')
-                self.value = hexlify(self.bytestr).decode('utf-8')
+                self._buffer = value.encode('utf-8')
         elif isinstance(value, bool):
             # If bool is not specifically tested, it passes the tests...
             raise TypeError(self.invalid_type_message)
         elif isinstance(value, bytes):
-            self.value = hexlify(value).decode('utf-8')
-            self.bytestr = value
+            self._buffer = value
+        elif isinstance(value, (bytearray, memoryview)):
+            view = memoryview(value)
+            if not view.c_contiguous:
+                # A strided view can't be hexlified or cast, copy it
+                view = memoryview(view.tobytes())
+            elif view.format != 'B' or view.ndim != 1:
+                view = view.cast('B')
+            self._buffer = view
         elif isinstance(value, int):
             if value < 0:
                 raise InvalidHexstrError('Int must be positive')
-            self.value = '{0:02x}'.format(value)
-            self.bytestr = unhexlify(self.value)
+            length = max(1, (value.bit_length() + 7) // 8)
+            self._buffer = value.to_bytes(length, 'big')
         else:
             raise TypeError(self.invalid_type_message)
 
     def to_base64(self):
         """Return a utf-8 encoded base64 representation of the hexstr."""
-        return b2a_base64(self.bytestr).decode('utf-8').strip()
+        return b2a_base64(self._buffer).decode('utf-8').strip()
 
     def __xor__(self, other):
-        """xor two hexstrings together, return a new Hexstr obj."""
+        """xor two hexstrings together, return a new Hexstr obj.
+
+        The xor is done across the whole buffer at once as a single
+        integer operation. As with zip, the result is truncated to the
+        shorter of the two buffers.
+        """
         if not isinstance(other, Hexstr): 
             raise TypeError("Can't xor non Hexstr objects together")
 
-        return Hexstr(''.join(hex(x ^ y)[2:] for x, y in 
-                      zip(self.bytestr, other.bytestr)))
+        length = min(len(self._buffer), len(other._buffer))
+        x = int.from_bytes(self._buffer[:length], 'big')
+        y = int.from_bytes(other._buffer[:length], 'big')
+        return Hexstr((x ^ y).to_bytes(length, 'big'))
 
     def is_printable(self):
         """Test for printable characters in a Hexstr.
@@ -85,7 +148,172 @@ class Hexstr():
         Returns True if every character in bytestr are considered 
         printable, False otherwise.
         """
-        return all(chr(x) in string.printable for x in self.bytestr)
+        return is_printable(self._buffer)
+
+
+class HexstrArray():
+    """Many equal length hexstrs held in one contiguous 2D byte buffer.
+
+    Row i is buffer[i * width:(i + 1) * width]. Rows and contiguous row
+    slices are views into the buffer, not copies. With NumPy installed
+    the buffer is also viewed as a rows x width uint8 array and batch
+    operations are vectorised; without it they fall back to wide integer
+    and bytes operations.
+    """
+
+    __slots__ = ('_buffer', 'rows', 'width')
+
+    def __init__(self, buffer, width):
+        """Wrap a bytes-like buffer of rows of width bytes each."""
+        view = memoryview(buffer).cast('B')
+        if width <= 0 or len(view) % width:
+            raise InvalidHexstrError('Buffer must be a whole number of rows')
+        self._buffer = view
+        self.width = width
+        self.rows = len(view) // width
+
+    @classmethod
+    def from_hexstrs(cls, hexstrs):
+        """Parse an iterable of equal length hexstrs, skipping blank lines."""
+        lines = [line.strip() for line in hexstrs]
+        lines = [line for line in lines if line]
+        if not lines:
+            raise InvalidHexstrError('No hexstrs given')
+        width = len(lines[0])
+        if width % 2 or any(len(line) != width for line in lines):
+            raise InvalidHexstrError('Hexstrs must all be the same even '
+                                     'length')
+        try:
+            buffer = unhexlify(''.join(lines))
+        except (BinasciiError, ValueError):
+            raise InvalidHexstrError(Hexstr.invalid_hexstr_message)
+        return cls(buffer, width // 2)
+
+    @classmethod
+    def from_file(cls, path):
+        """Parse a file with one hexstr per line."""
+        with open(path) as infile:
+            return cls.from_hexstrs(infile)
+
+    def __len__(self):
+        return self.rows
+
+    @property
+    def shape(self):
+        return self.rows, self.width
+
+    @property
+    def buffer(self):
+        """The underlying buffer, without copying."""
+        return self._buffer
+
+    @property
+    def array(self):
+        """A rows x width NumPy view of the buffer (None without NumPy)."""
+        numpy = _numpy()
+        if numpy is None:
+            return None
+        return numpy.frombuffer(self._buffer, dtype=numpy.uint8).reshape(
+               self.rows, self.width)
+
+    def row(self, i):
+        """Row i as a memoryview into the buffer."""
+        if i < 0:
+            i += self.rows
+        if not 0 <= i < self.rows:
+            raise IndexError('row index out of range')
+        return self._buffer[i * self.width:(i + 1) * self.width]
+
+    def __getitem__(self, index):
+        """A Hexstr view of one row, or a HexstrArray of a row slice."""
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.rows)
+            if step == 1:
+                stop = max(start, stop)
+                return HexstrArray(self._buffer[start * self.width:
+                                                stop * self.width], self.width)
+            # Strided row slices can't be one contiguous buffer
+            return HexstrArray(b''.join(self.row(i) for i in
+                                        range(start, stop, step)), self.width)
+        return Hexstr(self.row(index))
+
+    def __iter__(self):
+        for i in range(self.rows):
+            yield self[i]
+
+    def _xor(self, keystream):
+        x = int.from_bytes(self._buffer, 'big')
+        x ^= int.from_bytes(keystream, 'big')
+        return HexstrArray(x.to_bytes(len(self._buffer), 'big'), self.width)
+
+    def xor_row(self, key):
+        """xor every row with the same key row of width bytes.
+
+        An int key is a single byte repeated across the row.
+        """
+        if isinstance(key, int):
+            key = bytes([key]) * self.width
+        if len(key) != self.width:
+            raise ValueError('Key row must be {} bytes'.format(self.width))
+        numpy = _numpy()
+        if numpy is not None:
+            key = numpy.frombuffer(bytes(key), dtype=numpy.uint8)
+            return HexstrArray((self.array ^ key).tobytes(), self.width)
+        return self._xor(bytes(key) * self.rows)
+
+    def xor_column(self, keys):
+        """xor each row with its own single byte key, keys[i] for row i."""
+        if len(keys) != self.rows:
+            raise ValueError('Key column must be {} bytes'.format(self.rows))
+        numpy = _numpy()
+        if numpy is not None:
+            keys = numpy.frombuffer(bytes(keys), dtype=numpy.uint8)
+            return HexstrArray((self.array ^ keys[:, None]).tobytes(),
+                               self.width)
+        return self._xor(b''.join(bytes([k]) * self.width for k in keys))
+
+    def histograms(self):
+        """Count the byte values of every row.
+
+        Returns a rows x 256 list of lists, indexed [row][byte].
+        """
+        numpy = _numpy()
+        if numpy is not None:
+            offsets = numpy.arange(self.rows, dtype=numpy.intp)[:, None] * 256
+            index = (self.array.astype(numpy.intp) + offsets).ravel()
+            return numpy.bincount(index, minlength=self.rows * 256).reshape(
+                   self.rows, 256).tolist()
+        tables = []
+        for i in range(self.rows):
+            histogram = [0] * 256
+            for b, count in Counter(self.row(i)).items():
+                histogram[b] = count
+            tables.append(histogram)
+        return tables
+
+    def duplicate_blocks(self, block_size=16):
+        """Count the blocks in each row which repeat an earlier block.
+
+        A trailing partial block in each row is ignored. Returns a list
+        of counts, one per row.
+        """
+        blocks = self.width // block_size
+        if not blocks:
+            return [0] * self.rows
+        numpy = _numpy()
+        if numpy is not None:
+            # View each block as one fixed width bytes value and sort, so
+            # repeats end up next to each other
+            data = numpy.ascontiguousarray(self.array[:, :blocks * block_size])
+            data = numpy.sort(data.view('S{}'.format(block_size)), axis=1)
+            return (data[:, 1:] == data[:, :-1]).sum(axis=1).tolist()
+        counts = []
+        for i in range(self.rows):
+            row = self.row(i)
+            seen = set(row[start:start + block_size].tobytes() for start in
+                       range(0, blocks * block_size, block_size))
+            counts.append(blocks - len(seen))
+        return counts
 
 
 if __name__ == '__main__':
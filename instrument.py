@@ -0,0 +1,144 @@
+#!/usr/bin/python3
+
+"""
+instrument.py
+
+Lightweight stage timers and counters for the attack scripts.
+
+Code is instrumented with named stages and counters:
+
+    with instrument.stage('keysize'):
+        ...
+    instrument.count('keys tried', 256)
+
+While disabled (the default) a stage is a shared no-op context manager
+and count is a single flag check, so instrumented hot paths cost next to
+nothing. Scripts take --profile and --profile-stats FILE switches via
+add_arguments and setup: a per-stage breakdown is printed to stderr at
+exit, and with --profile-stats a cProfile stats dump is written too
+(readable by pstats, snakeviz, gprof2dot or flameprof for flamegraphs).
+
+Counts made in worker processes are not collected.
+"""
+
+from collections import Counter, defaultdict
+import atexit
+import sys
+import time
+
+enabled = False
+timings = defaultdict(float)
+calls = Counter()
+counters = Counter()
+
+_started = None
+_profiler = None
+_stats_file = None
+
+
+class _Stage():
+    """Times the body of a with block into timings[name]."""
+
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        timings[self.name] += time.perf_counter() - self.start
+        calls[self.name] += 1
+        return False
+
+
+class _NullStage():
+    """Does nothing, used while instrumentation is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_null_stage = _NullStage()
+
+def stage(name):
+    """Context manager timing a named stage, a no-op when disabled."""
+    if not enabled:
+        return _null_stage
+    return _Stage(name)
+
+def count(name, n=1):
+    """Add n to a named counter, a no-op when disabled."""
+    if enabled:
+        counters[name] += n
+
+def reset():
+    """Clear all recorded timings and counters."""
+    timings.clear()
+    calls.clear()
+    counters.clear()
+
+def enable(stats_file=None):
+    """Start recording, and cProfile into stats_file if given."""
+    global enabled, _started, _profiler, _stats_file
+    enabled = True
+    _started = time.perf_counter()
+    if stats_file:
+        import cProfile
+        _stats_file = stats_file
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+
+def disable():
+    """Stop recording, writing the cProfile stats file if there is one."""
+    global enabled, _profiler
+    enabled = False
+    if _profiler is not None:
+        _profiler.disable()
+        _profiler.dump_stats(_stats_file)
+        _profiler = None
+
+def report(file=None):
+    """Print the per-stage breakdown and counters."""
+    file = file or sys.stderr
+    total = time.perf_counter() - _started if _started else 0
+    print('{:<24} {:>10} {:>7} {:>8}'.format('stage', 'seconds', '%', 'calls'),
+          file=file)
+    for name, seconds in sorted(timings.items(), key=lambda t: -t[1]):
+        print('{:<24} {:>10.4f} {:>6.1f}% {:>8}'.format(
+              name, seconds, 100 * seconds / total if total else 0,
+              calls[name]), file=file)
+    print('{:<24} {:>10.4f}'.format('total', total), file=file)
+    for name, n in sorted(counters.items()):
+        print('{:<24} {:>10}'.format(name, n), file=file)
+    if _stats_file:
+        print('cProfile stats written to {}'.format(_stats_file), file=file)
+
+def add_arguments(parser):
+    """Add the --profile and --profile-stats switches to an argparse parser."""
+    parser.add_argument('--profile', action='store_true',
+                        help='print a per-stage breakdown at exit')
+    parser.add_argument('--profile-stats', metavar='STATS_FILE',
+                        help='also dump cProfile stats to STATS_FILE')
+
+def setup(args):
+    """Enable instrumentation from parsed arguments, reporting at exit.
+
+    Returns True if instrumentation was enabled.
+    """
+    if not (args.profile or args.profile_stats):
+        return False
+    enable(args.profile_stats)
+
+    def finish():
+        disable()
+        report()
+    atexit.register(finish)
+    return True
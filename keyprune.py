@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+
+"""
+keyprune.py
+
+Prune single byte xor keys before any scoring is done.
+
+A key can only decrypt data to an all-printable (or any other allowed
+alphabet) plaintext if it maps every distinct byte of the data into the
+alphabet. So the distinct bytes are found once, and for each one the set
+of keys which map it into the alphabet is a precomputed 256 bit mask;
+AND'ing those masks together leaves exactly the keys worth scoring, in
+256 x |distinct| bit operations rather than a decrypt per key.
+
+A 256 entry table (1 for allowed bytes, 0 otherwise) is kept as well,
+for bulk membership checks with bytes.translate at C speed.
+"""
+
+import string
+
+PRINTABLE = string.printable.encode('ascii')
+
+
+class KeyPruner():
+    """Single byte xor key pruning for one alphabet."""
+
+    def __init__(self, alphabet=PRINTABLE):
+        """alphabet is the bytes every plaintext byte must be one of."""
+        self.alphabet = bytes(sorted(set(alphabet)))
+        # translate table: byte -> 1 if allowed, 0 otherwise
+        self.table = bytes(1 if b in self.alphabet else 0 for b in range(256))
+        # masks[d] has bit k set when d ^ k is allowed
+        self.masks = []
+        for d in range(256):
+            mask = 0
+            for p in self.alphabet:
+                mask |= 1 << (d ^ p)
+            self.masks.append(mask)
+
+    def allows(self, data):
+        """True if every byte of bytes-like data is in the alphabet."""
+        return 0 not in bytes(data).translate(self.table)
+
+    def key_mask(self, data):
+        """256 bit mask of the keys which keep data inside the alphabet."""
+        mask = (1 << 256) - 1
+        for d in set(bytes(data)):
+            mask &= self.masks[d]
+            if not mask:
+                break
+        return mask
+
+    def candidate_keys(self, data):
+        """List the keys which keep data inside the alphabet."""
+        mask = self.key_mask(data)
+        return [k for k in range(256) if mask >> k & 1]
+
+
+printable = KeyPruner()
+
+def is_printable(data):
+    """True if every byte of data is printable ascii."""
+    return printable.allows(data)
+
+def candidate_keys(data):
+    """Keys which decrypt data to all-printable ascii."""
+    return printable.candidate_keys(data)
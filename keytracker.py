@@ -0,0 +1,119 @@
+#!/usr/bin/python3
+
+"""
+keytracker.py
+
+Track the single byte xor key of a stream as it arrives, chunk by chunk.
+
+Each key is scored by the log-likelihood of the stream decrypted under
+it, i.e. the sum over every byte b seen of log p(b ^ key). Grouping by
+byte value, that is
+
+    score[key] = sum over b of histogram[b] * logp[b ^ key]
+
+an xor convolution of the running byte histogram with the log
+probability table. The Walsh-Hadamard transform turns xor convolution
+into a pointwise product, and the transform of logp is fixed, so after
+counting a chunk into the histogram all 256 scores are refreshed with
+two 256 point transforms. An update costs O(chunk + 256 log 256),
+however much of the stream has been seen and however many distinct
+bytes it holds.
+
+Treating the scores as log-likelihoods, the confidence in the best key
+is its posterior probability against the other 255 keys. The key is
+called stable once it has stayed best, at or above a confidence
+threshold, for a number of consecutive updates.
+"""
+
+from collections import Counter
+from freqy import get_model
+import instrument
+import math
+
+# Probability for bytes the model gives no frequency
+FLOOR = 1e-6
+CONFIDENCE = 0.999
+PATIENCE = 3
+
+
+def walsh_hadamard(values):
+    """Fast Walsh-Hadamard transform of a power of 2 length sequence.
+
+    Unnormalised, so applying it twice multiplies by the length.
+    """
+    values = list(values)
+    h = 1
+    while h < len(values):
+        for start in range(0, len(values), 2 * h):
+            for i in range(start, start + h):
+                x, y = values[i], values[i + h]
+                values[i], values[i + h] = x + y, x - y
+        h *= 2
+    return values
+
+def log_probabilities(model=None):
+    """log p(byte) for every byte under a freqy model (or model name)."""
+    model = get_model(model)
+    return [math.log(model.expected[model.fold[b]] or FLOOR)
+            for b in range(256)]
+
+
+class KeyTracker():
+    """Running best guess at the single byte xor key of a stream."""
+
+    def __init__(self, model=None, confidence=CONFIDENCE, patience=PATIENCE):
+        """Score against a freqy model (the built-in English by default).
+
+        The key is stable once it has been best, with at least confidence,
+        for patience updates in a row.
+        """
+        self._transformed = walsh_hadamard(log_probabilities(model))
+        self.threshold = confidence
+        self.patience = patience
+        self.histogram = [0] * 256
+        self.length = 0
+        self.scores = [0.0] * 256
+        self.key = None
+        self.confidence = 0.0
+        self._streak = 0
+
+    def update(self, chunk):
+        """Count the next chunk of the stream and rescore every key.
+
+        Returns True if the best key is stable.
+        """
+        histogram = self.histogram
+        for b, count in Counter(chunk).items():
+            histogram[b] += count
+        self.length += len(chunk)
+        instrument.count('bytes tracked', len(chunk))
+
+        transformed = walsh_hadamard(histogram)
+        product = [x * y for x, y in zip(transformed, self._transformed)]
+        self.scores = [s / 256 for s in walsh_hadamard(product)]
+
+        best = max(range(256), key=self.scores.__getitem__)
+        top = self.scores[best]
+        self.confidence = 1 / sum(math.exp(s - top) for s in self.scores)
+        if best == self.key and self.confidence >= self.threshold:
+            self._streak += 1
+        else:
+            self._streak = 1 if self.confidence >= self.threshold else 0
+        self.key = best
+        return self.stable
+
+    @property
+    def stable(self):
+        return self._streak >= self.patience
+
+    def ranked(self, n=5):
+        """The n best (key, mean log probability per byte), best first."""
+        keys = sorted(range(256), key=self.scores.__getitem__, reverse=True)
+        return [(key, self.scores[key] / (self.length or 1))
+                for key in keys[:n]]
+
+    def decrypt(self, chunk):
+        """Decrypt chunk under the current best key."""
+        if self.key is None:
+            raise ValueError('No key yet, update with some data first')
+        return bytes(chunk).translate(bytes(b ^ self.key for b in range(256)))
@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+
+"""
+loaders.py
+
+Memory-mapped, streaming loaders for the base64 and hex challenge files.
+
+The input file is memory-mapped rather than read, and decoded a window
+at a time, with line breaks and other whitespace dropped and any partial
+base64 quantum or hex pair carried over to the next window. So the text
+is never duplicated in memory as a whole.
+
+- iter_base64 / iter_hex:
+    yield the decoded bytes a chunk at a time, in constant memory.
+
+- load_base64 / load_hex:
+    decode the whole file into a single preallocated buffer, returned
+    as a memoryview.
+"""
+
+from binascii import a2b_base64, unhexlify
+from contextlib import contextmanager
+import mmap
+import os
+
+CHUNK_SIZE = 1 << 20
+WHITESPACE = b' \t\r\n\x0b\x0c'
+
+
+@contextmanager
+def mapped(path):
+    """Memory-map a file read only (an empty file maps to b'')."""
+    with open(path, 'rb') as infile:
+        if os.fstat(infile.fileno()).st_size == 0:
+            yield b''
+            return
+        with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+def _iter_text(path, quantum, decode, chunk_size):
+    """Decode a mapped text file in windows of whole quantums."""
+    with mapped(path) as text:
+        pending = b''
+        for start in range(0, len(text), chunk_size):
+            window = pending + text[start:start + chunk_size].translate(
+                     None, WHITESPACE)
+            ready = len(window) - len(window) % quantum
+            pending = window[ready:]
+            if ready:
+                yield decode(window[:ready])
+        if pending:
+            # Let the decoder complain about a truncated file
+            yield decode(pending)
+
+def iter_base64(path, chunk_size=CHUNK_SIZE):
+    """Yield the decoded bytes of a base64 file, a chunk at a time."""
+    return _iter_text(path, 4, a2b_base64, chunk_size)
+
+def iter_hex(path, chunk_size=CHUNK_SIZE):
+    """Yield the decoded bytes of a hex file, a chunk at a time."""
+    return _iter_text(path, 2, unhexlify, chunk_size)
+
+def _load(chunks, size):
+    """Fill a buffer of at most size bytes from chunks."""
+    buf = bytearray(size)
+    end = 0
+    for chunk in chunks:
+        buf[end:end + len(chunk)] = chunk
+        end += len(chunk)
+    return memoryview(buf)[:end]
+
+def load_base64(path, chunk_size=CHUNK_SIZE):
+    """Decode a whole base64 file, returning a memoryview of the bytes."""
+    # Four characters decode to at most three bytes
+    size = os.path.getsize(path) * 3 // 4 + 3
+    return _load(iter_base64(path, chunk_size), size)
+
+def load_hex(path, chunk_size=CHUNK_SIZE):
+    """Decode a whole hex file, returning a memoryview of the bytes."""
+    size = os.path.getsize(path) // 2 + 1
+    return _load(iter_hex(path, chunk_size), size)
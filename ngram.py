@@ -0,0 +1,160 @@
+#!/usr/bin/python3
+
+"""
+ngram.py
+
+Scores how English a piece of text is by its trigram log-likelihood.
+
+Character frequency alone (freqy) misranks short or mixed case text,
+since it ignores which letters follow which. Here every byte is mapped to
+one of a few classes (26 case folded letters, space, digit, punctuation,
+other whitespace and anything unprintable), and a model is trained into
+a single flat array holding the smoothed log-probability of every class
+trigram, indexed by (a * CLASSES + b) * CLASSES + c. Bigram and unigram
+probabilities are interpolated into that one table, so scoring is just a
+sum of lookups. Higher scores are better.
+
+Scoring can stop early: no trigram scores better than the best entry in
+the table, so once a candidate's partial score plus that best case for
+what is left cannot reach a bound (the best score so far), it is dropped.
+
+The default model is trained on english.txt, next to this module, the
+first time get_model() is called, so importing this module is cheap.
+"""
+
+from array import array
+from collections import Counter
+from freqy import chi_squared_keys
+from functools import lru_cache
+import instrument
+import math
+import os
+import string
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                      'english.txt')
+# Interpolation weights for trigram, bigram and unigram probabilities
+LAMBDAS = (0.6, 0.3, 0.1)
+
+
+def _classes():
+    """Build the byte -> class translate table."""
+    table = bytearray(256)
+    names = list(string.ascii_lowercase) + ['space', 'digit', 'punctuation',
+                                            'whitespace', 'other']
+    for b in range(256):
+        c = chr(b)
+        if b < 128 and c.isalpha():
+            table[b] = ord(c.lower()) - ord('a')
+        elif c == ' ':
+            table[b] = 26
+        elif c in string.digits:
+            table[b] = 27
+        elif c in string.punctuation:
+            table[b] = 28
+        elif c in string.whitespace:
+            table[b] = 29
+        else:
+            table[b] = 30
+    return bytes(table), names
+
+
+CLASS_TABLE, CLASS_NAMES = _classes()
+CLASSES = len(CLASS_NAMES)
+
+
+class NgramModel():
+    """Trigram log-likelihood model over byte classes."""
+
+    def __init__(self, logp):
+        """logp is a flat array of CLASSES ** 3 trigram log-probabilities."""
+        if len(logp) != CLASSES ** 3:
+            raise ValueError('Expected {} trigram entries'.format(CLASSES ** 3))
+        self.logp = array('d', logp)
+        self.best = max(self.logp)
+        # How far each trigram falls short of the best, for early abort
+        self.deficit = array('d', (p - self.best for p in self.logp))
+
+    @classmethod
+    def from_counts(cls, unigrams, bigrams, trigrams):
+        """Build a model from Counters of class tuples, with smoothing."""
+        l3, l2, l1 = LAMBDAS
+        total = sum(unigrams.values())
+        # Add one smoothing so unseen classes are unlikely, not impossible
+        p1 = [(unigrams[(a,)] + 1) / (total + CLASSES) for a in range(CLASSES)]
+        logp = array('d', bytes(8 * CLASSES ** 3))
+        for a in range(CLASSES):
+            for b in range(CLASSES):
+                context = bigrams[(a, b)]
+                p2 = [(bigrams[(b, c)] + p1[c]) / (unigrams[(b,)] + 1)
+                      for c in range(CLASSES)]
+                for c in range(CLASSES):
+                    p3 = (trigrams[(a, b, c)] + p2[c]) / (context + 1)
+                    p = l3 * p3 + l2 * p2[c] + l1 * p1[c]
+                    logp[(a * CLASSES + b) * CLASSES + c] = math.log(p)
+        return cls(logp)
+
+    @classmethod
+    def from_text(cls, text):
+        """Train a model on bytes (or str) text."""
+        if isinstance(text, str):
+            text = text.encode('utf-8')
+        classes = text.translate(CLASS_TABLE)
+        unigrams = Counter((a,) for a in classes)
+        bigrams = Counter(zip(classes, classes[1:]))
+        trigrams = Counter(zip(classes, classes[1:], classes[2:]))
+        return cls.from_counts(unigrams, bigrams, trigrams)
+
+    @classmethod
+    def from_file(cls, path=CORPUS):
+        with open(path, 'rb') as infile:
+            return cls.from_text(infile.read())
+
+    def score(self, data, bound=None):
+        """Total trigram log-likelihood of bytes-like data, higher is better.
+
+        If bound is given, scoring stops as soon as data can no longer
+        score above it, and None is returned instead.
+        """
+        instrument.count('candidates scored')
+        classes = bytes(data).translate(CLASS_TABLE)
+        n = len(classes) - 2
+        if n <= 0:
+            return 0.0
+        threshold = None if bound is None else bound - n * self.best
+        deficit = self.deficit
+        total = 0.0
+        i = CLASSES * classes[0] + classes[1]
+        for c in classes[2:]:
+            i = (i % (CLASSES * CLASSES)) * CLASSES + c
+            total += deficit[i]
+            if threshold is not None and total <= threshold:
+                return None
+        return total + n * self.best
+
+    def score_keys(self, data):
+        """Find the best single byte xor key for data.
+
+        Keys are tried in order of their unigram Chi-Squared score, so a
+        good bound is found early and hopeless keys abort after a few
+        bytes. Returns (key, score).
+        """
+        chi = chi_squared_keys(data)
+        data = bytes(data)
+        best_key, best_score = None, None
+        for key in sorted(range(256), key=chi.__getitem__):
+            instrument.count('keys tried')
+            plain = data.translate(XOR_TABLES[key])
+            score = self.score(plain, best_score)
+            if score is not None and (best_score is None or score > best_score):
+                best_key, best_score = key, score
+        return best_key, best_score
+
+
+# Translate tables xor'ing every byte with a constant key
+XOR_TABLES = [bytes(b ^ key for b in range(256)) for key in range(256)]
+
+@lru_cache(maxsize=None)
+def get_model(path=CORPUS):
+    """The model trained on a corpus file, trained once on first use."""
+    return NgramModel.from_file(path)
@@ -0,0 +1,277 @@
+#!/usr/bin/python3
+
+"""
+oracle.py
+
+A local ECB encryption oracle service, and a byte-at-a-time attack on it.
+
+The oracle encrypts AES-ECB(your input || unknown secret) under a fixed
+random key, as in challenge 12. It is served over a Unix socket or
+localhost TCP by an asyncio server, speaking length prefixed frames:
+
+    request:  4 byte big endian length, then the input bytes
+    response: 4 byte big endian length, then the ciphertext
+
+Responses come back in request order, so the client pipelines: a batch
+of queries is written in one go and the answers read back after, paying
+one round trip per batch rather than per query.
+
+The attack needs a 256 entry dictionary of last byte guesses for every
+secret byte. Rather than 256 queries, the guesses are batched into one
+query (each guess is exactly one block, so block i of the answer is
+guess i), and dictionaries are cached by the block - 1 known bytes they
+were built from. The ciphertexts of the block - 1 filler prefixes are
+fetched once up front, pipelined. So recovering n bytes costs about
+n + block queries.
+
+Usage:
+    oracle.py serve [--unix PATH | --port PORT] [secret]
+    oracle.py attack [--unix PATH | --port PORT]
+    oracle.py demo [secret]
+"""
+
+#######################################
+# IMPORTS
+#######################################
+
+from blockcipher import aes_ecb, get_cipher, BLOCK_SIZE
+from ecbdetect import duplicate_blocks
+from pkcs7 import pad
+import argparse
+import asyncio
+import instrument
+import os
+import struct
+import sys
+import time
+
+#######################################
+# DEFINES
+#######################################
+
+HOST = '127.0.0.1'
+MAX_QUERY = 1 << 20
+MAX_BLOCK_SIZE = 64
+FILLER = b'A'
+DEMO_SECRET_SIZE = 4096
+
+_frame = struct.Struct('>I')
+
+#######################################
+# ORACLE
+#######################################
+
+class EcbOracle():
+    """ECB encrypt input || secret under a fixed, by default random, key."""
+
+    def __init__(self, secret, key=None, block_size=BLOCK_SIZE,
+                 new_cipher=aes_ecb):
+        self.secret = bytes(secret)
+        self.block_size = block_size
+        self.key = os.urandom(block_size) if key is None else key
+        self._ecb = get_cipher(self.key, block_size, new_cipher)
+
+    def encrypt(self, data):
+        return self._ecb.encrypt_blocks(pad(bytes(data) + self.secret,
+                                            self.block_size))
+
+async def _handle(oracle, reader, writer):
+    """Answer one connection's frames in order until it closes."""
+    try:
+        while True:
+            try:
+                header = await reader.readexactly(_frame.size)
+            except asyncio.IncompleteReadError:
+                break
+            length, = _frame.unpack(header)
+            if length > MAX_QUERY:
+                break
+            answer = oracle.encrypt(await reader.readexactly(length))
+            writer.write(_frame.pack(len(answer)) + answer)
+            # Only waits once the write buffer passes its high water mark
+            await writer.drain()
+    finally:
+        writer.close()
+
+async def serve(oracle, path=None, host=HOST, port=0):
+    """Start serving oracle on a Unix socket at path, else on host:port.
+
+    Returns the asyncio server, port 0 picks a free port.
+    """
+    def handler(reader, writer):
+        return _handle(oracle, reader, writer)
+    if path is not None:
+        return await asyncio.start_unix_server(handler, path)
+    return await asyncio.start_server(handler, host, port)
+
+#######################################
+# CLIENT
+#######################################
+
+class OracleClient():
+    """Pipelining client for an oracle server.
+
+    Counts the queries made and the time spent waiting on them, so the
+    query rate can be reported.
+    """
+
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self.queries = 0
+        self.elapsed = 0.0
+
+    @classmethod
+    async def connect(cls, path=None, host=HOST, port=None):
+        """Connect to a Unix socket at path, else to host:port."""
+        if path is not None:
+            return cls(*await asyncio.open_unix_connection(path))
+        return cls(*await asyncio.open_connection(host, port))
+
+    async def query(self, data):
+        """Encrypt one input."""
+        return (await self.query_many([data]))[0]
+
+    async def query_many(self, inputs):
+        """Encrypt a batch of inputs, pipelined, returning a list."""
+        start = time.perf_counter()
+        frames = [_frame.pack(len(data)) + bytes(data) for data in inputs]
+        self._writer.write(b''.join(frames))
+        await self._writer.drain()
+        answers = []
+        for _ in frames:
+            length, = _frame.unpack(await self._reader.readexactly(
+                                    _frame.size))
+            answers.append(await self._reader.readexactly(length))
+        self.queries += len(frames)
+        self.elapsed += time.perf_counter() - start
+        instrument.count('oracle queries', len(frames))
+        return answers
+
+    @property
+    def rate(self):
+        """Queries per second so far."""
+        return self.queries / self.elapsed if self.elapsed else 0.0
+
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+
+#######################################
+# ATTACK
+#######################################
+
+async def probe(client, max_block_size=MAX_BLOCK_SIZE):
+    """Find the oracle's block size and secret length.
+
+    The ciphertext grows by a whole block once input || secret reaches a
+    block boundary, at which point the secret is that many bytes short
+    of the shorter ciphertext. Every input length is queried in one
+    pipelined batch. Returns (block_size, secret_length).
+    """
+    answers = await client.query_many(FILLER * n for n in
+                                      range(max_block_size + 1))
+    empty = len(answers[0])
+    for n, answer in enumerate(answers):
+        if len(answer) > empty:
+            return len(answer) - empty, empty - n
+    raise ValueError('No block size up to {}'.format(max_block_size))
+
+async def byte_at_a_time(client):
+    """Recover the oracle's secret, one byte at a time.
+
+    With block - 1 - (i % block) filler bytes in front, secret byte i is
+    the last byte of block i // block, and every other byte of that
+    block is already known. So the block matches exactly one of the 256
+    guesses made from those known bytes plus a last byte.
+    """
+    block_size, secret_length = await probe(client)
+    duplicates, _ = duplicate_blocks(await client.query(
+                                     FILLER * block_size * 3), block_size)
+    if not duplicates:
+        raise ValueError('Oracle is not encrypting in ECB mode')
+
+    # Every target block comes from one of block_size ciphertexts
+    targets = await client.query_many(FILLER * n for n in range(block_size))
+    dictionaries = {}
+    known = bytearray(FILLER * (block_size - 1))
+    for i in range(secret_length):
+        shift = block_size - 1 - i % block_size
+        start = (i // block_size) * block_size
+        target = targets[shift][start:start + block_size]
+        window = bytes(known[-(block_size - 1):])
+        if window not in dictionaries:
+            guesses = b''.join(window + bytes([b]) for b in range(256))
+            answer = await client.query(guesses)
+            dictionaries[window] = {answer[b * block_size:
+                                           (b + 1) * block_size]: b
+                                    for b in range(256)}
+        try:
+            known.append(dictionaries[window][target])
+        except KeyError:
+            raise ValueError('No guess matches secret byte {}'.format(i))
+    return bytes(known[block_size - 1:])
+
+#######################################
+# MAIN
+#######################################
+
+def read_secret(path):
+    """The first DEMO_SECRET_SIZE bytes of a file."""
+    with open(path, 'rb') as infile:
+        return infile.read(DEMO_SECRET_SIZE)
+
+async def run_attack(path=None, port=None):
+    client = await OracleClient.connect(path, port=port)
+    try:
+        start = time.perf_counter()
+        secret = await byte_at_a_time(client)
+        elapsed = time.perf_counter() - start
+    finally:
+        await client.close()
+    sys.stdout.buffer.write(secret)
+    sys.stdout.buffer.flush()
+    print('\n{} bytes recovered in {:.2f}s, {} queries ({:.0f} queries/s)'
+          .format(len(secret), elapsed, client.queries, client.rate),
+          file=sys.stderr)
+
+async def run_server(secret, path=None, port=0):
+    server = await serve(EcbOracle(secret), path, port=port)
+    for sock in server.sockets:
+        print('Serving on {}'.format(sock.getsockname()), file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+async def run_demo(secret):
+    server = await serve(EcbOracle(secret))
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        await run_attack(port=port)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='ECB byte-at-a-time oracle')
+    sub = parser.add_subparsers(dest='command')
+    sub.required = True
+    for name in ('serve', 'attack', 'demo'):
+        command = sub.add_parser(name)
+        if name != 'demo':
+            where = command.add_mutually_exclusive_group(
+                    required=name == 'attack')
+            where.add_argument('--unix', metavar='PATH')
+            where.add_argument('--port', type=int, default=0)
+        if name != 'attack':
+            command.add_argument('secret', nargs='?', default='english.txt')
+        instrument.add_arguments(command)
+    args = parser.parse_args(argv)
+    instrument.setup(args)
+
+    if args.command == 'serve':
+        asyncio.run(run_server(read_secret(args.secret), args.unix,
+                               args.port))
+    elif args.command == 'attack':
+        asyncio.run(run_attack(args.unix, args.port))
+    else:
+        asyncio.run(run_demo(read_secret(args.secret)))
+
+if __name__ == "__main__":
+    main()
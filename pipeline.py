@@ -0,0 +1,112 @@
+#!/usr/bin/python3
+
+"""
+pipeline.py
+
+Streaming block cipher stages which chain together over chunk iterators.
+
+Every stage takes an iterable of bytes-like chunks and yields bytes, so a
+file can be encrypted or decrypted end to end with bounded memory:
+
+    chunks = read_chunks(infile)
+    for chunk in cbc_encrypt_stream(pad_stream(chunks), key, iv):
+        outfile.write(chunk)
+
+encrypt_chunks and decrypt_chunks wire up the usual PKCS#7 + ECB/CBC
+chains, and encrypt_file and decrypt_file run them file to file.
+"""
+
+from blockcipher import aes_ecb, get_cipher, BLOCK_SIZE
+from cbc import cbc_decrypt, cbc_encrypt
+from pkcs7 import pad_stream, unpad_stream
+
+CHUNK_SIZE = 1 << 20
+
+
+def read_chunks(infile, chunk_size=CHUNK_SIZE):
+    """Yield chunk_size pieces of a binary file object."""
+    while True:
+        chunk = infile.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+def block_chunks(chunks, block_size=BLOCK_SIZE):
+    """Re-slice a stream of chunks into block aligned chunks.
+
+    Raises ValueError if the stream is not a multiple of block_size.
+    """
+    pending = bytearray()
+    for chunk in chunks:
+        pending += chunk
+        ready = len(pending) - len(pending) % block_size
+        if ready:
+            yield bytes(pending[:ready])
+            del pending[:ready]
+    if pending:
+        raise ValueError('Stream must be a multiple of {} bytes, '
+                         'pad it first'.format(block_size))
+
+def ecb_encrypt_stream(chunks, key, block_size=BLOCK_SIZE, new_cipher=aes_ecb):
+    """ECB encrypt a (padded) stream of chunks."""
+    ecb = get_cipher(key, block_size, new_cipher)
+    for chunk in block_chunks(chunks, block_size):
+        yield ecb.encrypt_blocks(chunk)
+
+def ecb_decrypt_stream(chunks, key, block_size=BLOCK_SIZE, new_cipher=aes_ecb):
+    """ECB decrypt a stream of chunks."""
+    ecb = get_cipher(key, block_size, new_cipher)
+    for chunk in block_chunks(chunks, block_size):
+        yield ecb.decrypt_blocks(chunk)
+
+def cbc_encrypt_stream(chunks, key, iv, block_size=BLOCK_SIZE,
+                       new_cipher=aes_ecb):
+    """CBC encrypt a (padded) stream, chaining across chunk boundaries."""
+    for chunk in block_chunks(chunks, block_size):
+        encrypted = cbc_encrypt(key, chunk, iv, block_size, new_cipher)
+        iv = encrypted[-block_size:]
+        yield encrypted
+
+def cbc_decrypt_stream(chunks, key, iv, block_size=BLOCK_SIZE,
+                       new_cipher=aes_ecb):
+    """CBC decrypt a stream, chaining across chunk boundaries."""
+    for chunk in block_chunks(chunks, block_size):
+        yield cbc_decrypt(key, chunk, iv, block_size, new_cipher)
+        iv = chunk[-block_size:]
+
+def encrypt_chunks(chunks, key, iv=None, block_size=BLOCK_SIZE,
+                   new_cipher=aes_ecb):
+    """PKCS#7 pad and encrypt a stream of chunks.
+
+    Uses CBC when an iv is given, ECB otherwise.
+    """
+    chunks = pad_stream(chunks, block_size)
+    if iv is None:
+        return ecb_encrypt_stream(chunks, key, block_size, new_cipher)
+    return cbc_encrypt_stream(chunks, key, iv, block_size, new_cipher)
+
+def decrypt_chunks(chunks, key, iv=None, block_size=BLOCK_SIZE,
+                   new_cipher=aes_ecb):
+    """Decrypt and PKCS#7 unpad a stream of chunks.
+
+    Uses CBC when an iv is given, ECB otherwise.
+    """
+    if iv is None:
+        chunks = ecb_decrypt_stream(chunks, key, block_size, new_cipher)
+    else:
+        chunks = cbc_decrypt_stream(chunks, key, iv, block_size, new_cipher)
+    return unpad_stream(chunks, block_size)
+
+def encrypt_file(infile, outfile, key, iv=None, block_size=BLOCK_SIZE,
+                 new_cipher=aes_ecb, chunk_size=CHUNK_SIZE):
+    """PKCS#7 pad and encrypt a binary file object into another."""
+    for chunk in encrypt_chunks(read_chunks(infile, chunk_size), key, iv,
+                                block_size, new_cipher):
+        outfile.write(chunk)
+
+def decrypt_file(infile, outfile, key, iv=None, block_size=BLOCK_SIZE,
+                 new_cipher=aes_ecb, chunk_size=CHUNK_SIZE):
+    """Decrypt and PKCS#7 unpad a binary file object into another."""
+    for chunk in decrypt_chunks(read_chunks(infile, chunk_size), key, iv,
+                                block_size, new_cipher):
+        outfile.write(chunk)
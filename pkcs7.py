@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+
+"""
+pkcs7.py
+
+PKCS#7 padding, for whole buffers or streamed chunk iterators.
+
+The pad value is the number of pad bytes, 1 to block_size. A message
+already a multiple of block_size gets a whole block of padding, so
+unpadding is never ambiguous:
+
+    pad(b'YELLOW SUBMARINE', 20) == b'YELLOW SUBMARINE\x04\x04\x04\x04'
+
+The streaming versions only hold back the final partial (or, for
+unpad_stream, final whole) block, so memory is bounded by the chunk size.
+"""
+
+BLOCK_SIZE = 16
+
+
+class PaddingError(ValueError):
+    """Raise when PKCS#7 padding is missing or malformed."""
+
+
+def _check_block_size(block_size):
+    if not 0 < block_size < 256:
+        raise ValueError('PKCS#7 block size must be 1 to 255 bytes')
+
+def padding(length, block_size=BLOCK_SIZE):
+    """Return the pad bytes for a message of length bytes."""
+    _check_block_size(block_size)
+    fill = block_size - length % block_size
+    return bytes([fill]) * fill
+
+def pad(data, block_size=BLOCK_SIZE):
+    """Pad bytes-like data to a multiple of block_size."""
+    return bytes(data) + padding(len(data), block_size)
+
+def unpad(data, block_size=BLOCK_SIZE):
+    """Strip and validate the padding from bytes-like data."""
+    _check_block_size(block_size)
+    data = bytes(data)
+    if not data or len(data) % block_size:
+        raise PaddingError('Padded data must be a non-empty multiple of '
+                           '{} bytes'.format(block_size))
+    fill = data[-1]
+    if not 0 < fill <= block_size or data[-fill:] != bytes([fill]) * fill:
+        raise PaddingError('Invalid PKCS#7 padding')
+    return data[:-fill]
+
+def pad_stream(chunks, block_size=BLOCK_SIZE):
+    """Pad a stream of bytes-like chunks.
+
+    Yields block aligned bytes, holding back only the trailing partial
+    block, which is padded once the input ends.
+    """
+    _check_block_size(block_size)
+    pending = bytearray()
+    for chunk in chunks:
+        pending += chunk
+        ready = len(pending) - len(pending) % block_size
+        if ready:
+            yield bytes(pending[:ready])
+            del pending[:ready]
+    pending += padding(len(pending), block_size)
+    yield bytes(pending)
+
+def unpad_stream(chunks, block_size=BLOCK_SIZE):
+    """Strip the padding from a stream of bytes-like chunks.
+
+    Everything but the final block is passed straight through, the final
+    block is validated and unpadded once the input ends.
+    """
+    _check_block_size(block_size)
+    pending = bytearray()
+    for chunk in chunks:
+        pending += chunk
+        # Always keep between 1 and block_size bytes back
+        ready = (len(pending) - 1) // block_size * block_size
+        if ready > 0:
+            yield bytes(pending[:ready])
+            del pending[:ready]
+    last = unpad(pending, block_size)
+    if last:
+        yield last
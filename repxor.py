@@ -0,0 +1,274 @@
+#!/usr/bin/python3
+
+"""
+repxor.py
+
+Tools for repeating-key XOR (Vigenere style) ciphertexts.
+
+- repeating_xor / RepeatingXor / xor_file:
+    bytes-native repeating-key XOR, whole buffers, incremental chunks
+    or file to file in constant memory.
+
+- transpose / column_histograms:
+    zero-copy strided views of the columns of a ciphertext, and the
+    byte histogram of each column, without padding short columns.
+
+- estimate_keysize:
+    rank likely key sizes by the normalised hamming distance between
+    bytes one key length apart, over the whole ciphertext.
+
+- break_repeating_xor:
+    find the key by solving each column of the ciphertext as single
+    byte XOR, then decrypt.
+
+- beam_search:
+    fully solve the top few keysizes (in parallel) and keep the key
+    whose plaintext scores best, with its margin over the runner-up.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from cryptostr import bytes_hamming_distance
+from freqy import byte_histogram, chi_squared, chi_squared_histogram
+import instrument
+from statistics import mean, pstdev
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+MIN_KEYSIZE = 2
+MAX_KEYSIZE = 40
+CHUNK_SIZE = 1 << 20
+BEAM_WIDTH = 5
+
+
+class RepeatingXor():
+    """Incremental repeating-key XOR encoder/decoder.
+
+    The key is pre-tiled into a keystream a little longer than a chunk,
+    and each chunk is xor'd against it as one wide integer. The key phase
+    carries over between calls to update, so a stream can be fed in
+    arbitrary sized pieces.
+    """
+
+    def __init__(self, key, chunk_size=CHUNK_SIZE):
+        """key is bytes-like (or str, encoded as utf-8)."""
+        if isinstance(key, str):
+            key = key.encode('utf-8')
+        if not key:
+            raise ValueError('Key must not be empty')
+        self.key = bytes(key)
+        self.chunk_size = chunk_size
+        self.phase = 0
+        self._keystream = self.key * (chunk_size // len(self.key) + 2)
+
+    def update(self, data):
+        """xor the next piece of the stream, returning bytes."""
+        view = memoryview(data).cast('B')
+        instrument.count('bytes xored', len(view))
+        out = []
+        for start in range(0, len(view), self.chunk_size):
+            chunk = view[start:start + self.chunk_size]
+            keystream = self._keystream[self.phase:self.phase + len(chunk)]
+            x = int.from_bytes(chunk, 'big') ^ int.from_bytes(keystream, 'big')
+            out.append(x.to_bytes(len(chunk), 'big'))
+            self.phase = (self.phase + len(chunk)) % len(self.key)
+        return b''.join(out)
+
+
+def repeating_xor(data, key):
+    """Repeating-key XOR bytes, bytearray or memoryview data with key."""
+    return RepeatingXor(key).update(data)
+
+def xor_file(infile, outfile, key, chunk_size=CHUNK_SIZE):
+    """Repeating-key XOR one binary file object into another.
+
+    Reads into a single reusable buffer, so memory stays constant however
+    large the file is. Returns the number of bytes processed.
+    """
+    xor = RepeatingXor(key, chunk_size)
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+    total = 0
+    while True:
+        n = infile.readinto(buf)
+        if not n:
+            return total
+        outfile.write(xor.update(view[:n]))
+        total += n
+
+
+def transpose(data, keysize):
+    """Split data into keysize columns, column i being data[i::keysize].
+
+    Columns are strided memoryviews into data, nothing is copied. They
+    are not padded, so the first len(data) % keysize columns are one
+    byte longer than the rest.
+    """
+    view = memoryview(data).cast('B')
+    return [view[i::keysize] for i in range(keysize)]
+
+def column_histograms(data, keysize):
+    """Byte histogram of each column, a keysize x 256 list of lists.
+
+    With NumPy every column is counted in one bincount, by offsetting
+    each byte by 256 times its column number.
+    """
+    if numpy is not None:
+        array = numpy.frombuffer(data, dtype=numpy.uint8)
+        index = numpy.arange(len(array)) % keysize * 256 + array
+        return numpy.bincount(index, minlength=keysize * 256).reshape(
+               keysize, 256).tolist()
+    return [byte_histogram(column) for column in transpose(data, keysize)]
+
+def keysize_distance(data, keysize):
+    """Normalised hamming distance between data and itself shifted by keysize.
+
+    Every byte is compared with the byte one keysize later, which is the
+    same as averaging the distance over every pair of adjacent keysize
+    blocks across the full ciphertext. Bytes encrypted with the same key
+    byte cancel out the key, so the right keysize gives the lowest bits
+    per byte. Returns None when data is too short for two blocks.
+    """
+    data = memoryview(data)
+    if len(data) < 2 * keysize:
+        return None
+    compared = len(data) - keysize
+    return bytes_hamming_distance(data[:compared], data[keysize:]) / compared
+
+def estimate_keysize(data, min_keysize=MIN_KEYSIZE, max_keysize=MAX_KEYSIZE):
+    """Rank every keysize from min_keysize to max_keysize inclusive.
+
+    Returns a list of (keysize, distance, confidence) tuples, lowest
+    distance first. confidence is how many standard deviations below the
+    mean distance of all candidates a keysize sits, so a clear winner
+    stands well above the rest. Note multiples of the true keysize also
+    score well.
+    """
+    distances = []
+    for keysize in range(min_keysize, max_keysize + 1):
+        distance = keysize_distance(data, keysize)
+        if distance is not None:
+            distances.append((keysize, distance))
+    if not distances:
+        return []
+    average = mean(d for _, d in distances)
+    spread = pstdev(d for _, d in distances) or 1
+    distances.sort(key=lambda index: index[1])
+    return [(keysize, distance, (average - distance) / spread)
+            for keysize, distance in distances]
+
+def _cache_kind(kind, model):
+    """The cache kind for results under a named model.
+
+    Includes a digest of the model file, so retraining a model under the
+    same name doesn't return keys cached against the old one.
+    """
+    if model is None:
+        return kind
+    from freqmodel import model_digest
+    return '{}:{}@{}'.format(kind, model, model_digest(model))
+
+def _best_keysizes(ranking, width):
+    """The width best keysizes of an estimate_keysize ranking."""
+    if not ranking:
+        raise ValueError('Ciphertext too short to estimate a keysize, need '
+                         'at least {} bytes'.format(2 * MIN_KEYSIZE))
+    return [keysize for keysize, _, _ in ranking[:width]]
+
+def break_repeating_xor(data, keysize=None, cache=None, model=None):
+    """Break repeating-key XOR, returning (key, plaintext).
+
+    Uses the best estimated keysize unless one is given. Byte i of every
+    block was xor'd with key byte i, so each column data[i::keysize] is
+    solved as single byte XOR by its best Chi-Squared score, against the
+    named frequency model if one is given. The key is looked up in, and
+    stored to, cache if one is given. Raises ValueError if no keysize
+    is given and data is too short to estimate one.
+    """
+    if cache is not None:
+        kind = _cache_kind('repeating-xor:{}'.format(keysize or 'auto'),
+                           model)
+        key = cache.get(kind, data)
+        if key is not None:
+            key = bytes.fromhex(key)
+            return key, repeating_xor(data, key)
+        key, plain = break_repeating_xor(data, keysize, model=model)
+        cache.put(kind, data, key.hex())
+        return key, plain
+    if keysize is None:
+        with instrument.stage('keysize'):
+            keysize = _best_keysizes(estimate_keysize(data), 1)[0]
+    with instrument.stage('transpose'):
+        histograms = column_histograms(data, keysize)
+    key = bytearray()
+    with instrument.stage('columns'):
+        for histogram in histograms:
+            scores = chi_squared_histogram(histogram, model=model)
+            key.append(min(range(256), key=scores.__getitem__))
+    with instrument.stage('decrypt'):
+        plain = repeating_xor(data, key)
+    return bytes(key), plain
+
+def shortest_period(key):
+    """Collapse a key which repeats a shorter key, b'ICEICE' -> b'ICE'."""
+    for size in range(1, len(key)):
+        if len(key) % size == 0 and key == key[:size] * (len(key) // size):
+            return key[:size]
+    return key
+
+def solve_keysize(data, keysize, model=None):
+    """Break data at one keysize, returning (score, key, plaintext).
+
+    score is the Chi-Squared statistic of the whole plaintext.
+    """
+    key, plain = break_repeating_xor(data, keysize, model=model)
+    return chi_squared(plain, model), key, plain
+
+def beam_search(data, width=BEAM_WIDTH, workers=1, cache=None, model=None,
+                ranking=None):
+    """Break repeating-key XOR trying the width best keysizes.
+
+    Rather than trusting the hamming distance to pick the keysize, each
+    of the top width keysizes is solved fully, across a process pool with
+    workers > 1, and the key whose plaintext scores best is kept.
+    Multiples of the true keysize give the same key repeated, so keys are
+    collapsed to their shortest period first. Returns (key, plaintext,
+    margin), margin being how much worse the runner-up key scored (None
+    if every keysize agreed). ranking is the estimate_keysize result for
+    data, if the caller already has it. Raises ValueError if data is too
+    short to estimate a keysize.
+    """
+    if cache is not None:
+        kind = _cache_kind('repeating-xor-beam:{}'.format(width), model)
+        hit = cache.get(kind, data)
+        if hit is not None:
+            key = bytes.fromhex(hit[0])
+            return key, repeating_xor(data, key), hit[1]
+    if ranking is None:
+        with instrument.stage('keysize'):
+            ranking = estimate_keysize(data)
+    keysizes = _best_keysizes(ranking, width)
+    with instrument.stage('beam'):
+        if workers > 1 and len(keysizes) > 1:
+            data = bytes(data)
+            workers = min(workers, len(keysizes))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                solved = list(pool.map(solve_keysize, [data] * len(keysizes),
+                                       keysizes, [model] * len(keysizes)))
+        else:
+            solved = [solve_keysize(data, keysize, model)
+                      for keysize in keysizes]
+    best = {}
+    for score, key, plain in solved:
+        key = shortest_period(key)
+        if key not in best or score < best[key][0]:
+            best[key] = (score, plain)
+    ranked = sorted((score, key, plain) for key, (score, plain) in 
+                    best.items())
+    score, key, plain = ranked[0]
+    margin = ranked[1][0] - score if len(ranked) > 1 else None
+    if cache is not None:
+        cache.put(kind, data, [key.hex(), margin])
+    return key, plain, margin
@@ -0,0 +1,150 @@
+#!/usr/bin/python3
+
+"""
+resultcache.py
+
+A content addressed, on-disk cache of analysis results.
+
+Results (ranked key candidates and the like) are stored in SQLite, keyed
+by the kind of analysis, the scorer version and the SHA-256 of the
+ciphertext, so re-running an analysis over unchanged inputs is answered
+straight from disk, while a new scorer version never sees stale results.
+The cache is bounded in size, evicting the least recently used results.
+The total size is kept in a one row table, updated by triggers as
+results are stored and dropped, so checking it never scans the cache.
+
+The cache lives in $CRYPTOPALS_CACHE_DIR, or ~/.cache/cryptopals.
+"""
+
+from freqy import SCORER_VERSION
+from hashlib import sha256
+import json
+import os
+import sqlite3
+import time
+
+CACHE_DIR = os.environ.get('CRYPTOPALS_CACHE_DIR',
+                           os.path.expanduser('~/.cache/cryptopals'))
+CACHE_FILE = 'results.sqlite'
+MAX_BYTES = 64 << 20
+
+
+class ResultCache():
+    """Size bounded LRU cache of JSON results keyed by ciphertext."""
+
+    def __init__(self, path=None, max_bytes=MAX_BYTES,
+                 version=SCORER_VERSION):
+        """Open (creating if needed) the cache database at path."""
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, CACHE_FILE)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.version = version
+        self._db = sqlite3.connect(path)
+        # So rows replaced by INSERT OR REPLACE fire the delete trigger
+        self._db.execute('PRAGMA recursive_triggers = ON')
+        self._db.executescript("""
+            BEGIN;
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY, value TEXT NOT NULL,
+                size INTEGER NOT NULL, used REAL NOT NULL);
+            CREATE INDEX IF NOT EXISTS results_used ON results (used);
+            CREATE TABLE IF NOT EXISTS meta (
+                id INTEGER PRIMARY KEY CHECK (id = 0),
+                total INTEGER NOT NULL);
+            INSERT OR IGNORE INTO meta
+                SELECT 0, COALESCE(SUM(size), 0) FROM results;
+            CREATE TRIGGER IF NOT EXISTS results_insert AFTER INSERT
+                ON results BEGIN
+                UPDATE meta SET total = total + new.size WHERE id = 0;
+            END;
+            CREATE TRIGGER IF NOT EXISTS results_delete AFTER DELETE
+                ON results BEGIN
+                UPDATE meta SET total = total - old.size WHERE id = 0;
+            END;
+            COMMIT;
+            """)
+
+    def key(self, kind, data):
+        """Cache key for an analysis kind of bytes-like data."""
+        return '{}:{}:{}'.format(kind, self.version, sha256(data).hexdigest())
+
+    def get_many(self, kind, items):
+        """Look up many ciphertexts, returning {index: result} for hits."""
+        keys = [self.key(kind, data) for data in items]
+        hits = {}
+        # Stay well under SQLite's limit on bound parameters
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            rows = self._db.execute(
+                'SELECT key, value FROM results WHERE key IN ({})'.format(
+                ','.join('?' * len(batch))), batch).fetchall()
+            hits.update(rows)
+        if hits:
+            now = time.time()
+            self._db.executemany('UPDATE results SET used = ? WHERE key = ?',
+                                 [(now, key) for key in hits])
+            self._db.commit()
+        return {i: json.loads(hits[key]) for i, key in enumerate(keys)
+                if key in hits}
+
+    def get(self, kind, data):
+        """Return the cached result for data, or None."""
+        return self.get_many(kind, [data]).get(0)
+
+    def put_many(self, kind, items):
+        """Store (data, result) pairs, evicting old results if over size."""
+        now = time.time()
+        rows = []
+        for data, result in items:
+            value = json.dumps(result)
+            rows.append((self.key(kind, data), value, len(value), now))
+        self._db.executemany('INSERT OR REPLACE INTO results '
+                             'VALUES (?, ?, ?, ?)', rows)
+        self._evict()
+        self._db.commit()
+
+    def put(self, kind, data, result):
+        """Store the result for data."""
+        self.put_many(kind, [(data, result)])
+
+    def cached(self, kind, data, compute):
+        """Return the cached result for data, computing it on a miss."""
+        result = self.get(kind, data)
+        if result is None:
+            result = compute(data)
+            self.put(kind, data, result)
+        return result
+
+    @property
+    def total_bytes(self):
+        """The total size of the cached results."""
+        return self._db.execute('SELECT total FROM meta').fetchone()[0]
+
+    def _evict(self):
+        """Drop least recently used results until under max_bytes."""
+        total = self.total_bytes
+        if total <= self.max_bytes:
+            return
+        # Walks the used index oldest first, only as far as needed
+        rows = self._db.execute('SELECT key, size FROM results '
+                                'ORDER BY used')
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._db.executemany('DELETE FROM results WHERE key = ?', evicted)
+
+    def clear(self):
+        """Invalidate every cached result."""
+        self._db.execute('DELETE FROM results')
+        self._db.commit()
+
+    def __len__(self):
+        return self._db.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def close(self):
+        self._db.close()
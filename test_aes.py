@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+
+"""
+test_aes.py
+
+Unit tests for the table driven pure Python AES.
+"""
+
+import aes
+from blockcipher import pure_aes_ecb
+from cbc import cbc_decrypt, cbc_encrypt
+from loaders import load_base64
+import random
+import unittest
+
+
+class KnownValues(unittest.TestCase):
+
+    # FIPS-197 appendix C example vectors
+    plain = bytes.fromhex('00112233445566778899aabbccddeeff')
+    known_values = (
+        ('000102030405060708090a0b0c0d0e0f',
+         '69c4e0d86a7b0430d8cdb78070b4c55a'),
+        ('000102030405060708090a0b0c0d0e0f1011121314151617',
+         'dda97ca4864cdfe06eaf70a0ec0d7191'),
+        ('000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f',
+         '8ea2b7ca516745bfeafc49904b496089'))
+
+    def test_known_values(self):
+        """AES-128/192/256 should match the FIPS-197 examples"""
+        for key, cipher in self.known_values:
+            with self.subTest(key=key):
+                ecb = aes.AES(bytes.fromhex(key))
+                self.assertEqual(ecb.encrypt(self.plain).hex(), cipher)
+                self.assertEqual(ecb.decrypt(bytes.fromhex(cipher)),
+                                 self.plain)
+
+    def test_sbox(self):
+        """Spot check the generated S-box and its inverse"""
+        self.assertEqual((aes.SBOX[0x00], aes.SBOX[0x53]), (0x63, 0xed))
+        self.assertEqual(sorted(aes.SBOX), list(range(256)))
+        for b in range(256):
+            self.assertEqual(aes.INV_SBOX[aes.SBOX[b]], b)
+
+    def test_challenge_7(self):
+        """7.txt should decrypt under YELLOW SUBMARINE"""
+        decrypted = aes.AES(b'YELLOW SUBMARINE').decrypt(load_base64('7.txt'))
+        self.assertTrue(decrypted.startswith(b"I'm back and I'm ringin'"))
+
+    def test_cbc_known_value(self):
+        """CBC over the pure AES should match NIST SP 800-38A F.2.1"""
+        key = bytes.fromhex('2b7e151628aed2a6abf7158809cf4f3c')
+        iv = bytes.fromhex('000102030405060708090a0b0c0d0e0f')
+        plain = bytes.fromhex('6bc1bee22e409f96e93d7e117393172a'
+                              'ae2d8a571e03ac9c9eb76fac45af8e51')
+        cipher = bytes.fromhex('7649abac8119b246cee98e9b12e9197d'
+                               '5086cb9b507219ee95db113a917678b2')
+        self.assertEqual(cbc_encrypt(key, plain, iv, new_cipher=pure_aes_ecb),
+                         cipher)
+        self.assertEqual(cbc_decrypt(key, cipher, iv, new_cipher=pure_aes_ecb),
+                         plain)
+
+    def test_bad_input(self):
+        """Bad key sizes and partial blocks should raise ValueError"""
+        self.assertRaises(ValueError, aes.AES, b'short key')
+        self.assertRaises(ValueError, aes.AES(bytes(16)).encrypt, b'abc')
+
+    @unittest.skipIf(aes.numpy is None, 'NumPy is not installed')
+    def test_numpy_matches_python(self):
+        """Batched NumPy rounds should match the Python loop"""
+        data = random.Random(7).randbytes(16 * 100)
+        min_blocks = aes.NUMPY_MIN_BLOCKS
+        try:
+            for size in aes.KEY_SIZES:
+                ecb = aes.AES(bytes(range(size)))
+                aes.NUMPY_MIN_BLOCKS = 1
+                batched = ecb.encrypt(data), ecb.decrypt(data)
+                aes.NUMPY_MIN_BLOCKS = len(data)
+                looped = ecb.encrypt(data), ecb.decrypt(data)
+                self.assertEqual(batched, looped)
+        finally:
+            aes.NUMPY_MIN_BLOCKS = min_blocks
+
+
+if __name__ == '__main__':
+    unittest.main()
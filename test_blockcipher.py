@@ -0,0 +1,49 @@
+#!/usr/bin/python3
+
+"""
+test_blockcipher.py
+
+Unit tests for the cached bulk block cipher wrapper, using the toy ECB
+cipher so they run without pycryptodome.
+"""
+
+from blockcipher import cache_info, clear_cache, get_cipher, BlockCipher
+from toycipher import ToyECB
+import unittest
+
+
+class KnownValues(unittest.TestCase):
+
+    key = b'\x01\x02\x03\x04'
+    plain = b'Sixteen byte msg' * 3
+
+    def setUp(self):
+        clear_cache()
+
+    def test_bulk_matches_per_block(self):
+        """Bulk calls should match encrypting block by block"""
+        ecb = ToyECB(self.key)
+        cipher = BlockCipher(self.key, 4, ToyECB)
+        encrypted = cipher.encrypt_blocks(self.plain)
+        self.assertEqual(encrypted, b''.join(
+                         ecb.encrypt(self.plain[i:i + 4])
+                         for i in range(0, len(self.plain), 4)))
+        self.assertEqual(cipher.decrypt_blocks(encrypted), self.plain)
+
+    def test_partial_block(self):
+        """Data which isn't whole blocks should raise ValueError"""
+        cipher = BlockCipher(self.key, 4, ToyECB)
+        self.assertRaises(ValueError, cipher.encrypt_blocks, b'abcde')
+        self.assertRaises(ValueError, cipher.decrypt_blocks, b'abc')
+
+    def test_cache_reuses_ciphers(self):
+        """The same key bytes should give back the same cipher object"""
+        first = get_cipher(self.key, 4, ToyECB)
+        self.assertIs(get_cipher(bytearray(self.key), 4, ToyECB), first)
+        self.assertIsNot(get_cipher(b'\x00' * 4, 4, ToyECB), first)
+        info = cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
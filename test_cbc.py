@@ -0,0 +1,65 @@
+#!/usr/bin/python3
+
+"""
+test_cbc.py
+
+Unit tests for hand built CBC mode, using a toy ECB cipher so they run
+without pycryptodome.
+"""
+
+from cbc import cbc_decrypt, cbc_encrypt, xor_bytes
+from toycipher import ToyECB
+import unittest
+
+
+class KnownValues(unittest.TestCase):
+
+    key = b'\x01\x02\x03\x04'
+    iv = b'\x10\x20\x30\x40'
+    plain = b'Block of plain text, 32 bytes!!!'
+
+    def encrypt(self):
+        return cbc_encrypt(self.key, self.plain, self.iv, 4, ToyECB)
+
+    def test_encrypt_chains_blocks(self):
+        """Each block should be encrypted after xor with the previous"""
+        ecb = ToyECB(self.key)
+        encrypted = self.encrypt()
+        self.assertEqual(encrypted[:4],
+                         ecb.encrypt(xor_bytes(self.plain[:4], self.iv)))
+        self.assertEqual(encrypted[4:8], ecb.encrypt(
+                         xor_bytes(self.plain[4:8], encrypted[:4])))
+
+    def test_round_trip(self):
+        """Decrypting should give back the plaintext"""
+        decrypted = cbc_decrypt(self.key, self.encrypt(), self.iv, 4, ToyECB)
+        self.assertEqual(decrypted, self.plain)
+
+    def test_parallel_decrypt(self):
+        """Decrypting across a pool should match the single call"""
+        decrypted = cbc_decrypt(self.key, self.encrypt(), self.iv, 4, ToyECB,
+                                workers=2, chunk_size=10)
+        self.assertEqual(decrypted, self.plain)
+        decrypted = cbc_decrypt(self.key, self.encrypt(), self.iv, 4, ToyECB,
+                                workers=2, chunk_size=3)
+        self.assertEqual(decrypted, self.plain)
+
+    def test_bad_lengths(self):
+        """Unpadded data or a short IV should be rejected"""
+        self.assertRaises(ValueError, cbc_encrypt, self.key, b'abc', self.iv,
+                          4, ToyECB)
+        self.assertRaises(ValueError, cbc_decrypt, self.key, self.plain,
+                          b'\x00', 4, ToyECB)
+
+    def test_empty(self):
+        """Empty data should round trip to empty, whatever the IV"""
+        self.assertEqual(cbc_encrypt(self.key, b'', self.iv, 4, ToyECB), b'')
+        self.assertEqual(cbc_decrypt(self.key, b'', self.iv, 4, ToyECB), b'')
+
+    def test_xor_unequal_lengths(self):
+        """xor_bytes should reject buffers of different lengths"""
+        self.assertRaises(ValueError, xor_bytes, b'ab', b'a')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+#!/usr/bin/python3
+
+"""
+test_cryptopals.py
+
+Unit tests for the unified command line.
+"""
+
+from contextlib import redirect_stderr, redirect_stdout
+from cryptopals import main
+import io
+import os
+import tempfile
+import unittest
+
+
+class KnownValues(unittest.TestCase):
+
+    def run_main(self, *argv):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            main(list(argv))
+        return out.getvalue()
+
+    def test_break_single_many_inputs(self):
+        """Every line of every input should be broken"""
+        line = '1b37373331363f78151b7f2b783431333d78397828372d363c78373e783a393b3736'
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'lines.txt')
+            with open(path, 'w') as outfile:
+                outfile.write(line + '\n\n' + line + '\n')
+            out = self.run_main('break-single', '--no-cache', path, path)
+        self.assertEqual(out.count("Cooking MC's like a pound of bacon"), 4)
+
+    def test_break_single_skips_bad_hex(self):
+        """A bad hex line should be reported, not abort the run"""
+        line = '1b37373331363f78151b7f2b783431333d78397828372d363c78373e783a393b3736'
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'lines.txt')
+            with open(path, 'w') as outfile:
+                outfile.write('zz\n' + line + '\n')
+            out = io.StringIO()
+            with redirect_stdout(out), redirect_stderr(io.StringIO()) as err:
+                status = main(['break-single', '--no-cache', path])
+        self.assertEqual(status, 1)
+        self.assertIn('zz', err.getvalue())
+        self.assertIn("Cooking MC's like a pound of bacon", out.getvalue())
+
+    def test_detect_ecb(self):
+        """The bundled 8.txt should have one ECB line"""
+        out = self.run_main('detect-ecb', '8.txt')
+        self.assertTrue(out.startswith('3 repeated blocks (30.0%): d88061'))
+
+    def test_unknown_command(self):
+        """A missing or unknown subcommand should exit"""
+        with redirect_stdout(io.StringIO()), \
+             self.assertRaises(SystemExit):
+            main(['not-a-command'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+#!/usr/bin/python3
+
+"""
+test_ecbdetect.py
+
+Unit tests for the ECB block duplicate detector.
+"""
+
+from ecbdetect import detect_ecb, duplicate_blocks, duplicate_ratio
+from binascii import hexlify
+import unittest
+
+
+class KnownValues(unittest.TestCase):
+
+    block = b'YELLOW SUBMARINE'
+
+    def test_duplicate_blocks(self):
+        """Repeats of an earlier block should be counted once each"""
+        data = self.block * 3 + bytes(range(16)) + b'tail'
+        self.assertEqual(duplicate_blocks(data), (2, 4))
+        self.assertEqual(duplicate_blocks(bytearray(data), 8), (4, 8))
+
+    def test_duplicate_ratio_empty(self):
+        """No blocks means nothing repeats"""
+        self.assertEqual(duplicate_ratio(b'short'), 0.0)
+
+    def test_detect_ecb_ranking(self):
+        """Lines should be ranked by duplicate ratio, others dropped"""
+        unique = hexlify(bytes(range(64))).decode('utf-8')
+        some = hexlify(self.block * 2 + bytes(range(32))).decode('utf-8')
+        most = hexlify(self.block * 4).decode('utf-8')
+        results = detect_ecb([unique, some + '\n', 'not hex', most])
+        self.assertEqual([line for line, _, _ in results], [most, some])
+        self.assertEqual(results[0][1:], (3, 0.75))
+
+
+if __name__ == '__main__':
+    unittest.main()
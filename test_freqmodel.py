@@ -0,0 +1,93 @@
+#!/usr/bin/python3
+
+"""
+test_freqmodel.py
+
+Unit tests for corpus trained byte frequency models.
+"""
+
+from freqmodel import count_chunk, model_digest, train, FrequencyModel
+import freqy
+import repxor
+import os
+import tempfile
+import unittest
+
+
+class KnownValues(unittest.TestCase):
+
+    corpus = 'english.txt'
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'english.freq')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_count_chunk(self):
+        """Bytes and byte pairs should be counted"""
+        unigrams, bigrams = count_chunk(b'abab')
+        self.assertEqual((unigrams[ord('a')], unigrams[ord('b')]), (2, 2))
+        self.assertEqual(bigrams, {ord('a') << 8 | ord('b'): 2,
+                                   ord('b') << 8 | ord('a'): 1})
+
+    def test_chunking_does_not_change_counts(self):
+        """Any chunk size, in or out of process, should train the same"""
+        whole = train([self.corpus], 1 << 20, workers=1)
+        self.assertEqual(whole.bigram_total, whole.unigram_total - 1)
+        for chunk_size, workers in ((7, 1), (100, 2)):
+            with self.subTest(chunk_size=chunk_size, workers=workers):
+                model = train([self.corpus], chunk_size, workers)
+                self.assertEqual(list(model.unigram), list(whole.unigram))
+                self.assertEqual(list(model.bigram), list(whole.bigram))
+
+    def test_save_load_round_trip(self):
+        """A loaded model should match the one saved"""
+        model = train([self.corpus], workers=1)
+        model.save(self.path)
+        loaded = FrequencyModel.load(self.path)
+        self.assertEqual(list(loaded.unigram), list(model.unigram))
+        self.assertEqual(list(loaded.bigram), list(model.bigram))
+        self.assertEqual(loaded.unigram_total, model.unigram_total)
+
+    def test_load_invalid(self):
+        """A file which isn't a model should raise ValueError"""
+        with open(self.path, 'wb') as outfile:
+            outfile.write(b'not a model' * 10)
+        self.assertRaises(ValueError, FrequencyModel.load, self.path)
+
+    def test_model_digest(self):
+        """Retraining a model should change its digest and cache kind"""
+        train([self.corpus], workers=1).save(self.path)
+        digest = model_digest(self.path)
+        kind = repxor._cache_kind('repeating-xor', self.path)
+        self.assertEqual(model_digest(self.path), digest)
+        self.assertIn(digest, kind)
+        other = os.path.join(self.tmpdir.name, 'other.txt')
+        with open(other, 'wb') as outfile:
+            outfile.write(b'zzz qqq xxx' * 10)
+        train([other], workers=1).save(self.path)
+        self.assertNotEqual(model_digest(self.path), digest)
+        self.assertNotEqual(repxor._cache_kind('repeating-xor', self.path),
+                            kind)
+
+    def test_scorers_use_model(self):
+        """Chi-Squared scorers should find a key with a trained model"""
+        train([self.corpus], workers=1).save(self.path)
+        plain = b'The Quick Brown Fox, 1 lazy dog!\nAnother line of text.'
+        scores = freqy.chi_squared_keys(bytes(b ^ 0x5a for b in plain),
+                                        model=self.path)
+        self.assertEqual(min(range(256), key=scores.__getitem__), 0x5a)
+        self.assertLess(freqy.chi_squared(plain, self.path),
+                        freqy.chi_squared(bytes(range(60)), self.path))
+
+    def test_bigram_score(self):
+        """English pairs should score higher than noise"""
+        model = train([self.corpus], workers=1)
+        self.assertGreater(model.bigram_score(b'the other one is there'),
+                           model.bigram_score(b'xqzj kvqx zzqj'))
+
+
+if __name__ == '__main__':
+    unittest.main()
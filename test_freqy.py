@@ -0,0 +1,97 @@
+#!/usr/bin/python3
+
+"""
+test_freqy.py
+
+Unit tests for the English frequency scoring in freqy.
+"""
+
+from freqy import (byte_histogram, chi_squared, chi_squared_histogram,
+                   chi_squared_keys, english_freq_match_score, expected_freq,
+                   EnglishModel)
+import unittest
+
+
+class KnownValues(unittest.TestCase):
+
+    message = b"Cooking MC's like a pound of bacon"
+
+    def test_byte_histogram(self):
+        """Histogram should count each byte value"""
+        histogram = byte_histogram(b'abca')
+        self.assertEqual(len(histogram), 256)
+        self.assertEqual(histogram[ord('a')], 2)
+        self.assertEqual(histogram[ord('b')], 1)
+        self.assertEqual(sum(histogram), 4)
+
+    def test_chi_squared_keys_matches_chi_squared(self):
+        """Scores derived from the histogram should match decrypting"""
+        encrypted = bytes(b ^ 0x58 for b in self.message)
+        scores = chi_squared_keys(encrypted)
+        self.assertEqual(len(scores), 256)
+        for key in range(128):
+            with self.subTest(key=key):
+                decrypted = bytes(b ^ key for b in encrypted)
+                self.assertAlmostEqual(scores[key],
+                                       chi_squared(decrypted.decode('ascii')))
+
+    def test_chi_squared_histogram(self):
+        """Scoring a histogram should match scoring the data"""
+        encrypted = bytes(b ^ 0x58 for b in self.message)
+        self.assertEqual(chi_squared_histogram(byte_histogram(encrypted)),
+                         chi_squared_keys(encrypted))
+
+    def test_chi_squared_keys_empty(self):
+        """An empty message scores 0 for every key"""
+        self.assertEqual(chi_squared_keys(b''), [0] * 256)
+
+    def test_model_folds_case(self):
+        """Upper and lower case should score the same"""
+        model = EnglishModel()
+        self.assertEqual(model.score(self.message.upper()),
+                         model.score(self.message.lower()))
+
+    def test_model_accepts_str(self):
+        """str and utf-8 bytes should score the same"""
+        model = EnglishModel()
+        self.assertEqual(model.score(self.message.decode('utf-8')),
+                         model.score(self.message))
+
+    def test_score_many(self):
+        """Batch scoring should match scoring one at a time"""
+        model = EnglishModel()
+        candidates = [self.message, b'\x00\xff', b'']
+        self.assertEqual(model.score_many(candidates),
+                         [model.score(c) for c in candidates])
+
+    def test_expected_is_normalised(self):
+        """Expected frequencies should be probabilities, not percentages"""
+        model = EnglishModel()
+        self.assertAlmostEqual(sum(e for e in model.expected if e), 1)
+        total = sum(expected_freq.values())
+        self.assertAlmostEqual(model.expected[ord(' ')], 19.7 / total)
+        self.assertAlmostEqual(model.penalty_rate, 19.7 / total)
+
+    def test_chi_squared_known_values(self):
+        """Pin the statistic against probability scaled expected counts"""
+        self.assertAlmostEqual(chi_squared(self.message), 1029.662070419953)
+        self.assertAlmostEqual(chi_squared(b'etaoin shrdlu'),
+                               4.419258330809505)
+
+    def test_short_non_english_is_penalised(self):
+        """Short non-English input should score worse than short English"""
+        self.assertGreater(chi_squared(b'\xff\xfe\xfd'), chi_squared(b'the'))
+        self.assertGreater(chi_squared(bytes(range(1, 11))),
+                           chi_squared(b'hello worl'))
+        self.assertGreater(chi_squared('e1'), chi_squared('et'))
+        scores = chi_squared_keys(b'abc')
+        self.assertNotEqual(min(range(256), key=scores.__getitem__), 0)
+
+    def test_english_freq_match_score(self):
+        """English should match better than gibberish"""
+        self.assertGreater(english_freq_match_score(self.message),
+                           english_freq_match_score(b'Q}}y{|u2_Q5a2~{yw2'))
+
+
+if __name__ == '__main__':
+    unittest.main()
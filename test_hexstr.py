@@ -6,10 +6,17 @@ test_hexstr.py
 Unit tests for the class hexstr.
 """
 
-from hexstr import Hexstr, InvalidHexstrError
+from hexstr import Hexstr, HexstrArray, InvalidHexstrError
 from binascii import unhexlify
+import hexstr
+import os
+import random
+import subprocess
+import sys
 import unittest
 
+HERE = os.path.dirname(os.path.abspath(__file__))
+
 
 class KnownValues(unittest.TestCase):
 
@@ -76,6 +83,39 @@ class KnownValues(unittest.TestCase):
         result = hexstr1 ^ hexstr2
         self.assertEqual(result.value, expected_result.value)
 
+    def test_xor_small_bytes(self):
+        """xor results below 0x10 should keep their leading zero"""
+        result = Hexstr('0a1b') ^ Hexstr('0b1b')
+        self.assertEqual(result.value, '0100')
+
+    def test_xor_truncates_to_shorter(self):
+        """xor'ing unequal lengths should act like zip"""
+        result = Hexstr(b'\x01\x02\x03') ^ Hexstr(b'\x01')
+        self.assertEqual(result.bytestr, b'\x00')
+
+    def test_instantiate_from_buffer_without_copy(self):
+        """bytearray and memoryview should be shared, not copied"""
+        data = bytearray(b'\x00\x01')
+        hs = Hexstr(data)
+        data[0] = 0xff
+        self.assertEqual(hs.value, 'ff01')
+        self.assertEqual(Hexstr(memoryview(b'test')).bytestr, b'test')
+
+    def test_value_follows_mutable_buffer(self):
+        """value should not go stale when a shared buffer changes"""
+        data = bytearray(b'\x00\x01')
+        hs = Hexstr(data)
+        self.assertEqual(hs.value, '0001')
+        data[1] = 0xff
+        self.assertEqual(hs.value, '00ff')
+
+    def test_instantiate_from_strided_view(self):
+        """non-contiguous memoryviews should be copied, not rejected later"""
+        hs = Hexstr(memoryview(b'abcdef')[::2])
+        self.assertEqual(hs.bytestr, b'ace')
+        self.assertEqual(hs.value, '616365')
+        self.assertEqual(hs.to_base64(), 'YWNl')
+
     def test_xor_wrongtype(self):
         """xor'ing a Hexstr obj with a normal str should fail with TypeError"""
         hexstr1 = Hexstr('1c0111001f010100061a024b53535009181c')
@@ -94,5 +134,96 @@ class KnownValues(unittest.TestCase):
             hs = Hexstr(value)
             self.assertFalse(hs.is_printable())
 
+
+class ArrayKnownValues(unittest.TestCase):
+
+    lines = ['00112233', 'aabbccdd', '\n', '00112233']
+
+    def test_from_hexstrs(self):
+        """Lines should be parsed into one contiguous buffer"""
+        array = HexstrArray.from_hexstrs(self.lines)
+        self.assertEqual(array.shape, (3, 4))
+        self.assertEqual(bytes(array.buffer), 
+                         unhexlify('00112233aabbccdd00112233'))
+        self.assertEqual(array[1].value, 'aabbccdd')
+        self.assertEqual(array[-1].value, '00112233')
+
+    def test_invalid_hexstrs(self):
+        """Ragged, odd length, non hex or no lines should be rejected"""
+        for lines in (['0011', '001122'], ['001'], ['zz11'], []):
+            with self.subTest(lines=lines):
+                self.assertRaises(InvalidHexstrError,
+                                  HexstrArray.from_hexstrs, lines)
+
+    def test_slices_are_views(self):
+        """Contiguous row slices should share the buffer"""
+        buffer = bytearray(unhexlify('00112233aabbccdd00112233'))
+        array = HexstrArray(buffer, 4)
+        middle = array[1:3]
+        buffer[4] = 0xff
+        self.assertEqual(middle[0].value, 'ffbbccdd')
+        self.assertEqual(array[::2].shape, (2, 4))
+        self.assertEqual(array[5:].shape, (0, 4))
+
+    def test_xor_row_and_column(self):
+        """Row keys apply to every row, column keys one byte per row"""
+        array = HexstrArray.from_hexstrs(self.lines)
+        rows = array.xor_row(b'\x01\x00\x00\xff')
+        self.assertEqual([hs.value for hs in rows],
+                         ['011122cc', 'abbbcc22', '011122cc'])
+        rows = array.xor_column(b'\x00\x01\xff')
+        self.assertEqual([hs.value for hs in rows],
+                         ['00112233', 'abbacddc', 'ffeeddcc'])
+        self.assertEqual(array.xor_row(0xaa)[1].value, '00116677')
+        self.assertRaises(ValueError, array.xor_column, b'\x00')
+
+    def test_histograms(self):
+        """Each row should get its own byte counts"""
+        histograms = HexstrArray(b'aab' + b'ccc', 3).histograms()
+        self.assertIsInstance(histograms, list)
+        self.assertEqual(histograms[0][ord('a')], 2)
+        self.assertEqual(histograms[0][ord('c')], 0)
+        self.assertEqual(histograms[1][ord('c')], 3)
+
+    @unittest.skipIf(hexstr._numpy() is None, 'NumPy is not installed')
+    def test_numpy_matches_python(self):
+        """Vectorised batch operations should match the fallbacks"""
+        rng = random.Random(7)
+        # Repeat some rows' blocks so duplicate_blocks has work to do
+        rows = [rng.randbytes(32) for _ in range(20)]
+        rows += [row[:16] * 2 for row in rows[:5]]
+        array = HexstrArray(b''.join(rows), 32)
+        key = rng.randbytes(32)
+        keys = rng.randbytes(len(rows))
+
+        def run():
+            return (array.histograms(), bytes(array.xor_row(key).buffer),
+                    bytes(array.xor_column(keys).buffer),
+                    array.duplicate_blocks())
+        vectorised = run()
+        loader = hexstr._numpy
+        try:
+            hexstr._numpy = lambda: None
+            looped = run()
+        finally:
+            hexstr._numpy = loader
+        self.assertIsInstance(vectorised[0], list)
+        self.assertEqual(vectorised, looped)
+
+    def test_numpy_is_lazy(self):
+        """Importing hexstr should not import NumPy"""
+        code = 'import hexstr, sys; sys.exit("numpy" in sys.modules)'
+        self.assertEqual(subprocess.run([sys.executable, '-c', code],
+                                        cwd=HERE).returncode, 0)
+
+    def test_duplicate_blocks(self):
+        """8.txt should have one row with repeated blocks"""
+        array = HexstrArray.from_file('8.txt')
+        counts = array.duplicate_blocks()
+        self.assertEqual(len(counts), len(array))
+        self.assertEqual(counts[132], 3)
+        self.assertEqual(sum(counts), 3)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,38 @@
+#!/usr/bin/python3
+
+"""
+test_instrument.py
+
+Unit tests for the stage timers and counters.
+"""
+
+import instrument
+import unittest
+
+
+class KnownValues(unittest.TestCase):
+
+    def tearDown(self):
+        instrument.disable()
+        instrument.reset()
+
+    def test_disabled_records_nothing(self):
+        """Nothing should be recorded while disabled"""
+        with instrument.stage('stage'):
+            instrument.count('things', 5)
+        self.assertEqual(dict(instrument.timings), {})
+        self.assertEqual(dict(instrument.counters), {})
+
+    def test_enabled_records(self):
+        """Stages and counters should accumulate while enabled"""
+        instrument.enable()
+        for _ in range(2):
+            with instrument.stage('stage'):
+                instrument.count('things', 5)
+        self.assertEqual(instrument.calls['stage'], 2)
+        self.assertGreaterEqual(instrument.timings['stage'], 0)
+        self.assertEqual(instrument.counters['things'], 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
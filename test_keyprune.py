@@ -0,0 +1,43 @@
+#!/usr/bin/python3
+
+"""
+test_keyprune.py
+
+Unit tests for single byte xor key pruning.
+"""
+
+from keyprune import candidate_keys, is_printable, KeyPruner
+import string
+import unittest
+
+
+class KnownValues(unittest.TestCase):
+
+    def brute_force(self, data, alphabet):
+        return [k for k in range(256) if all(b ^ k in alphabet for b in data)]
+
+    def test_candidate_keys_match_brute_force(self):
+        """The mask should keep exactly the keys a decrypt would"""
+        printable = string.printable.encode('ascii')
+        for data in (b"Cooking MC's like a pound of bacon", b'\x00\x7f',
+                     bytes(range(0, 256, 7)), b''):
+            with self.subTest(data=data):
+                self.assertEqual(candidate_keys(data),
+                                 self.brute_force(data, printable))
+
+    def test_custom_alphabet(self):
+        """Any alphabet can be used"""
+        pruner = KeyPruner(b'ab')
+        self.assertEqual(pruner.candidate_keys(b'a'), [0, 3])
+        self.assertTrue(pruner.allows(b'abba'))
+        self.assertFalse(pruner.allows(b'abc'))
+
+    def test_is_printable(self):
+        """Bulk check should agree with string.printable"""
+        self.assertTrue(is_printable(b'This should be OK\n'))
+        self.assertFalse(is_printable(b'This \xff'))
+        self.assertFalse(is_printable(bytearray(b'\x07')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+#!/usr/bin/python3
+
+"""
+test_keytracker.py
+
+Unit tests for the online single byte xor key tracker.
+"""
+
+from keytracker import log_probabilities, walsh_hadamard, KeyTracker
+import random
+import unittest
+
+
+class KnownValues(unittest.TestCase):
+
+    plain = (b"Cooking MC's like a pound of bacon, "
+             b"and the quick brown fox jumps over the lazy dog. ") * 4
+    key = 0x58
+
+    def encrypt(self):
+        return bytes(b ^ self.key for b in self.plain)
+
+    def test_walsh_hadamard_inverse(self):
+        """Transforming twice should scale by the length"""
+        values = random.Random(1).choices(range(100), k=256)
+        self.assertEqual(walsh_hadamard(walsh_hadamard(values)),
+                         [v * 256 for v in values])
+
+    def test_scores_match_direct_sum(self):
+        """Scores should be the log-likelihood of each decryption"""
+        logp = log_probabilities()
+        tracker = KeyTracker()
+        tracker.update(self.encrypt())
+        for key in (0, self.key, 0xff):
+            with self.subTest(key=key):
+                self.assertAlmostEqual(tracker.scores[key], sum(
+                                       logp[b ^ key] for b in self.encrypt()),
+                                       places=6)
+
+    def test_chunking_does_not_change_scores(self):
+        """Many small updates should score the same as one big one"""
+        whole, pieces = KeyTracker(), KeyTracker()
+        whole.update(self.encrypt())
+        for i in range(0, len(self.plain), 7):
+            pieces.update(self.encrypt()[i:i + 7])
+        for a, b in zip(whole.scores, pieces.scores):
+            self.assertAlmostEqual(a, b, places=6)
+
+    def test_stabilises_on_key(self):
+        """The key should be found and settle well before the end"""
+        tracker = KeyTracker()
+        encrypted = self.encrypt()
+        for i in range(0, len(encrypted), 16):
+            if tracker.update(encrypted[i:i + 16]):
+                break
+        self.assertTrue(tracker.stable)
+        self.assertLess(tracker.length, len(encrypted))
+        self.assertEqual(tracker.key, self.key)
+        self.assertEqual(tracker.ranked(1)[0][0], self.key)
+        self.assertEqual(tracker.decrypt(encrypted), self.plain)
+
+    def test_unstable_on_change(self):
+        """A change of best key should restart the streak"""
+        tracker = KeyTracker(patience=2)
+        tracker.update(self.encrypt())
+        self.assertFalse(tracker.stable)
+        tracker.update(bytes(b ^ 0x20 for b in self.plain * 4))
+        self.assertFalse(tracker.stable)
+
+    def test_decrypt_needs_data(self):
+        """Decrypting before any update should raise ValueError"""
+        self.assertRaises(ValueError, KeyTracker().decrypt, b'abc')
+
+
+if __name__ == '__main__':
+    unittest.main()
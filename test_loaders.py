@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+
+"""
+test_loaders.py
+
+Unit tests for the memory-mapped base64 and hex loaders.
+"""
+
+from binascii import a2b_base64, b2a_base64, Error as BinasciiError
+from loaders import iter_base64, iter_hex, load_base64, load_hex
+import os
+import tempfile
+import unittest
+
+
+class KnownValues(unittest.TestCase):
+
+    data = bytes(range(256)) * 3 + b'trailing'
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, 'wb') as outfile:
+            outfile.write(text)
+        return path
+
+    def base64_file(self, data, line=60):
+        text = b2a_base64(data, newline=False)
+        lines = [text[i:i + line] for i in range(0, len(text), line)]
+        return self.write('data.b64', b'\r\n'.join(lines) + b'\n')
+
+    def test_load_base64_matches_binascii(self):
+        """Loading a challenge file should match decoding it whole"""
+        with open('6.txt', 'rb') as infile:
+            expected = a2b_base64(infile.read())
+        self.assertEqual(bytes(load_base64('6.txt')), expected)
+
+    def test_base64_chunk_sizes(self):
+        """Windows that split lines and quantums should decode the same"""
+        path = self.base64_file(self.data)
+        for chunk_size in (1, 3, 4, 7, 61, 1000):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(b''.join(iter_base64(path, chunk_size)),
+                                 self.data)
+                self.assertEqual(bytes(load_base64(path, chunk_size)),
+                                 self.data)
+
+    def test_hex_chunk_sizes(self):
+        """Hex files with whitespace should decode for any window size"""
+        text = self.data.hex().encode()
+        path = self.write('data.hex', b'\n'.join(
+                          text[i:i + 33] for i in range(0, len(text), 33)))
+        for chunk_size in (1, 2, 5, 64, 1000):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(b''.join(iter_hex(path, chunk_size)),
+                                 self.data)
+                self.assertEqual(bytes(load_hex(path, chunk_size)),
+                                 self.data)
+
+    def test_empty_file(self):
+        """An empty file should load as no bytes"""
+        path = self.write('empty.txt', b'')
+        self.assertEqual(bytes(load_base64(path)), b'')
+        self.assertEqual(list(iter_hex(path)), [])
+
+    def test_truncated_hex(self):
+        """An odd number of hex digits should raise"""
+        path = self.write('odd.hex', b'abc\n')
+        self.assertRaises(BinasciiError, load_hex, path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+#!/usr/bin/python3
+
+"""
+test_ngram.py
+
+Unit tests for the trigram log-likelihood scorer.
+"""
+
+from ngram import get_model, NgramModel, CLASSES
+import unittest
+
+english = get_model()
+
+
+class KnownValues(unittest.TestCase):
+
+    plain = b"Cooking MC's like a pound of bacon"
+
+    def test_english_scores_higher(self):
+        """English should outscore the same bytes shuffled"""
+        self.assertGreater(english.score(b'the quick brown fox'),
+                           english.score(b'xq zzv jjjjkk wwwq.'))
+
+    def test_case_insensitive(self):
+        """Letters are case folded"""
+        self.assertEqual(english.score(self.plain.upper()),
+                         english.score(self.plain.lower()))
+
+    def test_bound(self):
+        """A candidate that can't beat the bound should be dropped"""
+        score = english.score(self.plain)
+        self.assertEqual(english.score(self.plain, score - 1), score)
+        self.assertIsNone(english.score(self.plain, score))
+        self.assertIsNone(english.score(b'\x00' * 40, score))
+
+    def test_score_keys(self):
+        """The best single byte key should be found"""
+        encrypted = bytes(b ^ 0x58 for b in self.plain)
+        key, score = english.score_keys(encrypted)
+        self.assertEqual(key, 0x58)
+        self.assertEqual(score, english.score(self.plain))
+
+    def test_get_model_is_cached(self):
+        """The default model should be trained once and reused"""
+        self.assertIs(get_model(), english)
+
+    def test_from_text(self):
+        """A trained model should have one entry per class trigram"""
+        model = NgramModel.from_text('abc abc abc')
+        self.assertEqual(len(model.logp), CLASSES ** 3)
+        self.assertGreater(model.score(b'abc'), model.score(b'cba'))
+        self.assertRaises(ValueError, NgramModel, [0.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/python3
+
+"""
+test_oracle.py
+
+Unit tests for the ECB oracle service and byte-at-a-time attack, using
+the toy ECB cipher so they run without pycryptodome.
+"""
+
+from oracle import byte_at_a_time, probe, serve, EcbOracle, OracleClient
+from toycipher import ToyECB
+import asyncio
+import os
+import tempfile
+import unittest
+
+
+class KnownValues(unittest.TestCase):
+
+    secret = (b"Rollin' in my 5.0\nWith my rag-top down so my hair can "
+              b"blow\n") * 4 + b'\x00\xff odd bytes'
+
+    def oracle(self, secret=None):
+        return EcbOracle(self.secret if secret is None else secret,
+                         b'\x13\x37\xbe\xef', 4, ToyECB)
+
+    def run_client(self, oracle, attack, unix=False):
+        """Serve oracle and run attack(client) against it."""
+        async def run(path):
+            server = await serve(oracle, path)
+            port = None if path else server.sockets[0].getsockname()[1]
+            async with server:
+                client = await OracleClient.connect(path, port=port)
+                try:
+                    return await attack(client), client
+                finally:
+                    await client.close()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'oracle.sock') if unix else None
+            return asyncio.run(run(path))
+
+    def test_pipelined_answers_in_order(self):
+        """A pipelined batch should be answered in request order"""
+        oracle = self.oracle()
+        inputs = [bytes([n]) * n for n in range(50)]
+        answers, client = self.run_client(
+                          oracle, lambda client: client.query_many(inputs))
+        self.assertEqual(answers, [oracle.encrypt(data) for data in inputs])
+        self.assertEqual(client.queries, 50)
+
+    def test_probe(self):
+        """The block size and secret length should be found"""
+        for length in (0, 1, 4, 7):
+            with self.subTest(length=length):
+                result, _ = self.run_client(self.oracle(self.secret[:length]),
+                                            probe)
+                self.assertEqual(result, (4, length))
+
+    def test_byte_at_a_time_tcp(self):
+        """The attack should recover the secret over localhost"""
+        secret, client = self.run_client(self.oracle(), byte_at_a_time)
+        self.assertEqual(secret, self.secret)
+        # One query per byte at most, plus the set up
+        self.assertLessEqual(client.queries, len(self.secret) + 100)
+        self.assertGreater(client.rate, 0)
+
+    def test_byte_at_a_time_unix(self):
+        """The attack should recover the secret over a Unix socket"""
+        secret, _ = self.run_client(self.oracle(), byte_at_a_time, unix=True)
+        self.assertEqual(secret, self.secret)
+
+    def test_not_ecb(self):
+        """An oracle which doesn't repeat blocks should be refused"""
+        class NotECB(ToyECB):
+            def encrypt(self, data):
+                return os.urandom(len(data))
+        oracle = EcbOracle(self.secret, b'\x00' * 4, 4, NotECB)
+        self.assertRaises(ValueError, self.run_client, oracle,
+                          byte_at_a_time)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+#!/usr/bin/python3
+
+"""
+test_pkcs7.py
+
+Unit tests for PKCS#7 padding.
+"""
+
+from pkcs7 import pad, pad_stream, unpad, unpad_stream, PaddingError
+import unittest
+
+
+class KnownValues(unittest.TestCase):
+
+    message = b'YELLOW SUBMARINE'
+
+    def test_pad_known_value(self):
+        """The challenge example should pad with four \\x04 bytes"""
+        self.assertEqual(pad(self.message, 20),
+                         b'YELLOW SUBMARINE\x04\x04\x04\x04')
+
+    def test_pad_full_block(self):
+        """A block aligned message gets a whole block of padding"""
+        self.assertEqual(pad(self.message, 16), self.message + b'\x10' * 16)
+
+    def test_unpad_round_trip(self):
+        """Unpadding should undo padding for every length"""
+        for length in range(40):
+            with self.subTest(length=length):
+                data = bytes(range(length))
+                self.assertEqual(unpad(pad(data)), data)
+
+    def test_unpad_invalid(self):
+        """Bad padding should raise PaddingError"""
+        for bad in (b'', b'abc', b'A' * 15 + b'\x00', b'A' * 14 + b'\x01\x02',
+                    b'A' * 15 + b'\x11'):
+            with self.subTest(bad=bad):
+                self.assertRaises(PaddingError, unpad, bad)
+
+    def test_streams_match_whole_buffer(self):
+        """Streaming in odd sized chunks should match whole buffers"""
+        data = bytes(range(200))
+        chunks = [data[i:i + 7] for i in range(0, len(data), 7)]
+        padded = b''.join(pad_stream(chunks))
+        self.assertEqual(padded, pad(data))
+        chunks = [padded[i:i + 5] for i in range(0, len(padded), 5)]
+        self.assertEqual(b''.join(unpad_stream(chunks)), data)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+#!/usr/bin/python3
+
+"""
+test_repxor.py
+
+Unit tests for the repeating-key XOR tools.
+"""
+
+from cryptostr import bytes_hamming_distance
+from itertools import cycle
+from repxor import (beam_search, break_repeating_xor, column_histograms,
+                    estimate_keysize, keysize_distance, repeating_xor,
+                    shortest_period, transpose, xor_file, RepeatingXor)
+import io
+import unittest
+
+
+class KnownValues(unittest.TestCase):
+
+    plain = (b"I'm back and I'm ringin' the bell \n"
+             b"A rockin' on the mike while the fly girls yell \n"
+             b"In ecstasy in the back of me \n"
+             b"Well that's my DJ Deshay cuttin' all them Z's \n") * 4
+    key = b'Terminator X: Bring'
+
+    def encrypt(self, plain, key):
+        return bytes(p ^ k for p, k in zip(plain, cycle(key)))
+
+    def test_bytes_hamming_distance(self):
+        """The wokka wokka distance really is 37"""
+        self.assertEqual(bytes_hamming_distance(b'this is a test',
+                                                b'wokka wokka!!!'), 37)
+
+    def test_repeating_xor(self):
+        """Known ICE answer, and bytearray/memoryview input"""
+        stanza = (b"Burning 'em, if you ain't quick and nimble\n"
+                  b"I go crazy when I hear a cymbal")
+        expected = bytes.fromhex(
+            '0b3637272a2b2e63622c2e69692a23693a2a3c6324202d623d63343c2a2622'
+            '6324272765272a282b2f20430a652e2c652a3124333a653e2b2027630c692b'
+            '20283165286326302e27282f')
+        self.assertEqual(repeating_xor(stanza, 'ICE'), expected)
+        self.assertEqual(repeating_xor(bytearray(stanza), b'ICE'), expected)
+        self.assertEqual(repeating_xor(memoryview(expected), b'ICE'), stanza)
+
+    def test_phase_across_chunks(self):
+        """Odd sized pieces and chunks should keep the key phase"""
+        expected = self.encrypt(self.plain, self.key)
+        xor = RepeatingXor(self.key, chunk_size=7)
+        pieces = [self.plain[i:i + 5] for i in range(0, len(self.plain), 5)]
+        self.assertEqual(b''.join(xor.update(p) for p in pieces), expected)
+
+    def test_xor_file(self):
+        """File to file should match the whole buffer result"""
+        outfile = io.BytesIO()
+        total = xor_file(io.BytesIO(self.plain), outfile, self.key, 10)
+        self.assertEqual(total, len(self.plain))
+        self.assertEqual(outfile.getvalue(), self.encrypt(self.plain, self.key))
+
+    def test_empty_key(self):
+        """An empty key makes no sense"""
+        self.assertRaises(ValueError, RepeatingXor, b'')
+
+    def test_estimate_keysize(self):
+        """The true keysize should be ranked first"""
+        ranked = estimate_keysize(self.encrypt(self.plain, self.key))
+        self.assertEqual(ranked[0][0], len(self.key))
+        self.assertGreater(ranked[0][2], ranked[1][2])
+
+    def test_break_repeating_xor(self):
+        """The key and plaintext should be recovered"""
+        key, plain = break_repeating_xor(self.encrypt(self.plain, self.key))
+        self.assertEqual(key, self.key)
+        self.assertEqual(plain, self.plain)
+
+    def test_shortest_period(self):
+        """Repeated keys should collapse to the repeating unit"""
+        self.assertEqual(shortest_period(b'ICEICE'), b'ICE')
+        self.assertEqual(shortest_period(b'aaaa'), b'a')
+        self.assertEqual(shortest_period(b'ICEIC'), b'ICEIC')
+
+    def test_beam_search(self):
+        """The beam should find the key, in one process or many"""
+        encrypted = self.encrypt(self.plain, self.key)
+        key, plain, margin = beam_search(encrypted, 3)
+        self.assertEqual((key, plain), (self.key, self.plain))
+        self.assertGreater(margin, 0)
+        self.assertEqual(beam_search(encrypted, 3, workers=2),
+                         (key, plain, margin))
+        self.assertEqual(beam_search(encrypted, 3, ranking=estimate_keysize(
+                                     encrypted)), (key, plain, margin))
+
+    def test_transpose(self):
+        """Columns should be unpadded views of every keysize'th byte"""
+        data = bytearray(b'abcdefgh')
+        columns = transpose(data, 3)
+        self.assertEqual([bytes(c) for c in columns], [b'adg', b'beh', b'cf'])
+        data[0] = ord('z')
+        self.assertEqual(bytes(columns[0]), b'zdg')
+
+    def test_column_histograms(self):
+        """Each column should be counted on its own"""
+        histograms = column_histograms(b'aabbab', 2)
+        self.assertEqual(len(histograms), 2)
+        self.assertEqual((histograms[0][ord('a')], histograms[0][ord('b')]),
+                         (2, 1))
+        self.assertEqual((histograms[1][ord('a')], histograms[1][ord('b')]),
+                         (1, 2))
+        self.assertEqual(sum(histograms[1]), 3)
+
+    def test_keysize_distance_too_short(self):
+        """Too short for two blocks gives no distance"""
+        self.assertIsNone(keysize_distance(b'abc', 2))
+        self.assertEqual(estimate_keysize(b'a'), [])
+
+    def test_too_short_to_break(self):
+        """Breaking without a keysize estimate should raise ValueError"""
+        for data in (b'', b'abc'):
+            with self.subTest(data=data):
+                self.assertRaises(ValueError, break_repeating_xor, data)
+                self.assertRaises(ValueError, beam_search, data)
+        self.assertEqual(len(break_repeating_xor(b'abc', 1)[0]), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
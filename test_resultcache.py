@@ -0,0 +1,100 @@
+#!/usr/bin/python3
+
+"""
+test_resultcache.py
+
+Unit tests for the on-disk result cache.
+"""
+
+from resultcache import ResultCache
+from xordetect import detect
+import os
+import tempfile
+import unittest
+
+
+class KnownValues(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'results.sqlite')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_get_put(self):
+        """Results should round trip, and misses give None"""
+        cache = ResultCache(self.path)
+        self.assertIsNone(cache.get('kind', b'data'))
+        cache.put('kind', b'data', [[1, 2.5]])
+        self.assertEqual(cache.get('kind', b'data'), [[1, 2.5]])
+        self.assertIsNone(cache.get('other', b'data'))
+        self.assertEqual(cache.get_many('kind', [b'x', b'data']),
+                         {1: [[1, 2.5]]})
+        cache.close()
+
+    def test_version_and_clear(self):
+        """A new scorer version or clear should invalidate results"""
+        cache = ResultCache(self.path, version=1)
+        cache.put('kind', b'data', 1)
+        newer = ResultCache(self.path, version=2)
+        self.assertIsNone(newer.get('kind', b'data'))
+        newer.close()
+        cache.clear()
+        self.assertIsNone(cache.get('kind', b'data'))
+        cache.close()
+
+    def test_cached_computes_once(self):
+        """cached should only compute on a miss"""
+        cache = ResultCache(self.path)
+        calls = []
+        compute = lambda data: calls.append(data) or len(data)
+        self.assertEqual(cache.cached('kind', b'abc', compute), 3)
+        self.assertEqual(cache.cached('kind', b'abc', compute), 3)
+        self.assertEqual(calls, [b'abc'])
+        cache.close()
+
+    def test_lru_eviction(self):
+        """Least recently used results should be evicted over max_bytes"""
+        cache = ResultCache(self.path, max_bytes=20)
+        cache.put('kind', b'a', 'x' * 8)
+        cache.put('kind', b'b', 'x' * 8)
+        cache.get('kind', b'a')
+        cache.put('kind', b'c', 'x' * 8)
+        self.assertIsNotNone(cache.get('kind', b'a'))
+        self.assertIsNone(cache.get('kind', b'b'))
+        self.assertEqual(len(cache), 2)
+        cache.close()
+
+    def test_total_bytes(self):
+        """The running total should follow puts, replaces and evictions"""
+        cache = ResultCache(self.path, max_bytes=20)
+        cache.put('kind', b'a', 'x' * 8)
+        cache.put('kind', b'a', 'x' * 4)
+        self.assertEqual(cache.total_bytes, 6)
+        cache.put_many('kind', [(b'b', 'x' * 8), (b'c', 'x' * 8)])
+        self.assertEqual(cache.total_bytes, 20)
+        cache.put('kind', b'd', 'x' * 8)
+        self.assertLessEqual(cache.total_bytes, 20)
+        cache.close()
+        reopened = ResultCache(self.path, max_bytes=20)
+        self.assertEqual(reopened.total_bytes, reopened._db.execute(
+                         'SELECT SUM(size) FROM results').fetchone()[0])
+        reopened.clear()
+        self.assertEqual(reopened.total_bytes, 0)
+        reopened.close()
+
+    def test_detect_with_cache(self):
+        """Cached detection should match uncached detection"""
+        with open('4.txt') as infile:
+            lines = infile.readlines()[:40]
+        cache = ResultCache(self.path)
+        expected = detect(lines, workers=1)
+        self.assertEqual(detect(lines, workers=1, cache=cache), expected)
+        self.assertEqual(len(cache), 40)
+        self.assertEqual(detect(lines, workers=1, cache=cache), expected)
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
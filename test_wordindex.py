@@ -0,0 +1,57 @@
+#!/usr/bin/python3
+
+"""
+test_wordindex.py
+
+Unit tests for the memory-mapped word index.
+"""
+
+from wordindex import WordIndex
+import os
+import tempfile
+import unittest
+
+
+class KnownValues(unittest.TestCase):
+
+    words = b'Apple\nbanana\n\ncherry\napple\nZebra\n'
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'words.txt')
+        with open(self.path, 'wb') as word_file:
+            word_file.write(self.words)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_lookup(self):
+        """Words should be found case insensitively, as bytes or str"""
+        index = WordIndex(self.path)
+        for word in (b'apple', b'APPLE', 'Banana', 'zebra', b'cherry'):
+            with self.subTest(word=word):
+                self.assertIn(word, index)
+        for word in (b'', b'app', b'durian', 'zebras'):
+            with self.subTest(word=word):
+                self.assertNotIn(word, index)
+        index.close()
+
+    def test_sorted_unique(self):
+        """The index should hold each lowercased word once, sorted"""
+        index = WordIndex(self.path)
+        self.assertEqual([index[i] for i in range(len(index))],
+                         [b'apple', b'banana', b'cherry', b'zebra'])
+        index.close()
+
+    def test_rebuild_on_change(self):
+        """Changing the word list should rebuild the index"""
+        WordIndex(self.path).close()
+        with open(self.path, 'ab') as word_file:
+            word_file.write(b'durian\n')
+        index = WordIndex(self.path)
+        self.assertIn(b'durian', index)
+        index.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
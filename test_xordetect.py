@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+
+"""
+test_xordetect.py
+
+Unit tests for the batch single-byte XOR detector.
+"""
+
+from xordetect import best_key, detect
+from binascii import hexlify
+import unittest
+
+
+class KnownValues(unittest.TestCase):
+
+    plain = b"Cooking MC's like a pound of bacon"
+    noise = ['0e3647e8592d35514a081243582536ed3de6734059001e3f535ce6271032',
+             '334b041de124f73c18011a50e608097ac308ecee501337ec3e100854201d',
+             '40e127f51c10031d0133590b1e490f3514e05a54143d08222c2a4071e351']
+
+    def encrypted(self, key):
+        return hexlify(bytes(b ^ key for b in self.plain)).decode('utf-8')
+
+    def test_best_key(self):
+        """The best key should decrypt a known English line"""
+        _, key = best_key(self.encrypted(0x58))
+        self.assertEqual(key, 0x58)
+
+    def test_detect_finds_line(self):
+        """The English line should be ranked first"""
+        line = self.encrypted(0x21)
+        results = detect(self.noise + [line + '\n', '', 'zz'], workers=1)
+        self.assertEqual(results[0][:2], (line, 0x21))
+
+    def test_detect_top_is_bounded(self):
+        """Only top results should be returned, best first"""
+        lines = self.noise * 10 + [self.encrypted(k) for k in range(1, 9)]
+        results = detect(lines, top=2, chunk_size=3, workers=1)
+        self.assertEqual(len(results), 2)
+        self.assertLessEqual(results[0][2], results[1][2])
+
+    def test_detect_drops_unprintable(self):
+        """Lines with no key giving printable plaintext are dropped"""
+        self.assertEqual(detect(self.noise, workers=1), [])
+
+    def test_detect_no_prune(self):
+        """Without pruning every line gets a best key"""
+        line = self.encrypted(0x21)
+        results = detect(self.noise + [line], workers=1, prune=False)
+        self.assertEqual(len(results), 4)
+        self.assertEqual(results[0][:2], (line, 0x21))
+
+    def test_detect_pool(self):
+        """A process pool should give the same answer as one process"""
+        lines = self.noise + [self.encrypted(0x21)]
+        self.assertEqual(detect(lines, chunk_size=1, workers=2),
+                         detect(lines, chunk_size=1, workers=1))
+
+
+if __name__ == '__main__':
+    unittest.main()
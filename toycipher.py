@@ -0,0 +1,34 @@
+#!/usr/bin/python3
+
+"""
+toycipher.py
+
+A toy ECB block cipher for the unit tests, so block cipher modes can be
+tested without pycryptodome.
+"""
+
+
+def _xor(xs, ys):
+    return bytes(x ^ y for x, y in zip(xs, ys))
+
+
+class ToyECB():
+    """Stand in block cipher: xor each 4 byte block with the key then
+    rotate it by one byte. Not secure, but invertible and block wise."""
+
+    def __init__(self, key):
+        self.key = key
+
+    def encrypt(self, data):
+        out = b''
+        for i in range(0, len(data), 4):
+            block = _xor(data[i:i + 4], self.key)
+            out += block[1:] + block[:1]
+        return out
+
+    def decrypt(self, data):
+        out = b''
+        for i in range(0, len(data), 4):
+            block = data[i:i + 4]
+            out += _xor(block[-1:] + block[:-1], self.key)
+        return out
@@ -0,0 +1,115 @@
+#!/usr/bin/python3
+
+"""
+wordindex.py
+
+A prebuilt, memory-mapped index of an English word list.
+
+The word list (one word per line) is lowercased, deduplicated and sorted
+into a packed blob stored next to it as <words>.idx:
+
+    header  - magic, source size, source mtime, word count
+    offsets - count + 1 native uint32 offsets into the blob
+    blob    - the sorted words, back to back
+
+The index is memory-mapped read only, so every process using it shares
+the same pages through the OS cache, and lookups are a binary search on
+bytes with nothing decoded. It is rebuilt automatically whenever the size
+or mtime of the word list changes.
+"""
+
+from array import array
+import instrument
+import mmap
+import os
+import struct
+
+DEFAULT_WORDS = './english-words/words.txt'
+MAGIC = b'WORDIDX1'
+HEADER = struct.Struct('<8sQdQ')
+
+
+def build_index(path, index_path):
+    """Build the packed index for the word list at path."""
+    stat = os.stat(path)
+    with open(path, 'rb') as word_file:
+        words = sorted(set(line.strip().lower() for line in word_file) - {b''})
+    offsets = array('I', [0])
+    for word in words:
+        offsets.append(offsets[-1] + len(word))
+    # Write to a temporary file and rename, so concurrent readers never
+    # see a half written index
+    tmp_path = '{}.{}.tmp'.format(index_path, os.getpid())
+    with open(tmp_path, 'wb') as index_file:
+        index_file.write(HEADER.pack(MAGIC, stat.st_size, stat.st_mtime,
+                                     len(words)))
+        index_file.write(offsets.tobytes())
+        index_file.write(b''.join(words))
+    os.replace(tmp_path, index_path)
+
+
+class WordIndex():
+    """Read only set-like view of a word list, backed by an mmap index."""
+
+    def __init__(self, path=DEFAULT_WORDS, index_path=None):
+        """Open (building or rebuilding if stale) the index for path."""
+        self.path = path
+        self.index_path = index_path or path + '.idx'
+        if self._is_stale():
+            build_index(self.path, self.index_path)
+        with open(self.index_path, 'rb') as index_file:
+            self._map = mmap.mmap(index_file.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        _, _, _, self._count = HEADER.unpack_from(self._map)
+        blob_start = HEADER.size + 4 * (self._count + 1)
+        self._offsets = memoryview(self._map)[HEADER.size:blob_start].cast('I')
+        self._blob = memoryview(self._map)[blob_start:]
+
+    def _is_stale(self):
+        """Check the index exists and matches the word list on disk."""
+        try:
+            with open(self.index_path, 'rb') as index_file:
+                header = index_file.read(HEADER.size)
+        except FileNotFoundError:
+            return True
+        if len(header) != HEADER.size:
+            return True
+        magic, size, mtime, _ = HEADER.unpack(header)
+        stat = os.stat(self.path)
+        return (magic != MAGIC or size != stat.st_size 
+                or mtime != stat.st_mtime)
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        """Return the i'th word in sorted order, as bytes."""
+        if not 0 <= i < self._count:
+            raise IndexError('word index out of range')
+        return bytes(self._blob[self._offsets[i]:self._offsets[i + 1]])
+
+    def __contains__(self, word):
+        """Case insensitive lookup of a bytes (or str) word."""
+        if isinstance(word, str):
+            word = word.encode('utf-8')
+        word = word.lower()
+        instrument.count('words looked up')
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self[mid] < word:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo < self._count and self[lo] == word
+
+    def close(self):
+        self._offsets.release()
+        self._blob.release()
+        self._map.close()
+
+
+if __name__ == '__main__':
+    import sys
+    index = WordIndex(*sys.argv[1:2])
+    print('{} words indexed in {}'.format(len(index), index.index_path))
@@ -0,0 +1,204 @@
+#!/usr/bin/python3
+
+"""
+xordetect.py
+
+Detect single-byte XOR encrypted lines in large files of hex strings.
+
+Lines are streamed in chunks to a process pool, every single byte key is
+scored from one histogram of each line, and only a bounded heap of the
+best (line, key, score) results is kept. By default only keys which
+decrypt a line to printable ascii are scored, and lines with no such key
+are dropped (--no-prune scores every key). Given a ResultCache, the
+ranked keys of each line are cached, and only uncached lines are scored.
+
+Usage:
+    xordetect.py [-n TOP] [-w WORKERS] [-c CHUNK_SIZE] [--no-prune]
+                 [--no-cache] [--clear-cache] [infile]
+
+Reads from stdin when no infile (or '-') is given.
+"""
+
+#######################################
+# IMPORTS
+#######################################
+
+from binascii import unhexlify, Error as BinasciiError
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from freqy import chi_squared_keys
+from keyprune import candidate_keys
+from resultcache import ResultCache
+import argparse
+import heapq
+import instrument
+import os
+import sys
+import time
+
+#######################################
+# DEFINES
+#######################################
+
+TOP_RESULTS = 5
+CHUNK_SIZE = 1024
+RANKED_KEYS = 5
+CACHE_KIND = 'single-xor'
+PRINTABLE_CACHE_KIND = 'single-xor-printable'
+
+#######################################
+# FUNCTIONS
+#######################################
+
+def rank_keys(data, n=RANKED_KEYS, prune=False):
+    """Return the n best [key, score] candidates for single byte xor'd data
+
+    With prune, only keys giving all-printable plaintext are candidates.
+    """
+    keys = candidate_keys(data) if prune else range(256)
+    if not keys:
+        return []
+    scores = chi_squared_keys(data, keys)
+    return [[key, scores[key]] for key in
+            sorted(keys, key=scores.__getitem__)[:n]]
+
+def best_key(hexline):
+    "Return (score, key) of the best single byte key for a hex line"
+    key, score = rank_keys(unhexlify(hexline), 1)[0]
+    return score, key
+
+def _push(heap, top, score, line, key):
+    "Keep the top lowest scores in a max-heap of (-score, line, key)"
+    if len(heap) < top:
+        heapq.heappush(heap, (-score, line, key))
+    elif -score > heap[0][0]:
+        heapq.heapreplace(heap, (-score, line, key))
+
+def _score_chunk(chunk, prune=True):
+    "Rank the keys of a chunk of (line, data), returning (line, data, ranked)"
+    instrument.count('lines scanned', len(chunk))
+    return [(line, data, rank_keys(data, prune=prune)) for line, data in chunk]
+
+def _chunks(lines, chunk_size):
+    "Group non-empty lines into lists of (line, data), skipping bad hex"
+    def decoded():
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield line, unhexlify(line)
+            except (BinasciiError, ValueError):
+                continue
+    chunks = decoded()
+    while True:
+        chunk = list(islice(chunks, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def detect(lines, top=TOP_RESULTS, chunk_size=CHUNK_SIZE, workers=None,
+           cache=None, prune=True):
+    """Find the lines most likely to be single byte xor'd English.
+
+    lines is any iterable of hex strings (a file object works). Returns a
+    list of up to top (line, key, score) tuples, best (lowest) score first.
+    With workers=1 everything runs in this process. Ranked keys are
+    looked up in, and stored to, cache if one is given. With prune, only
+    keys giving printable plaintext are scored.
+    """
+    workers = workers or os.cpu_count() or 1
+    kind = PRINTABLE_CACHE_KIND if prune else CACHE_KIND
+    heap = []
+
+    def merge(results):
+        if cache is not None:
+            cache.put_many(kind, [(data, ranked) for _, data, ranked in
+                                  results])
+        for line, _, ranked in results:
+            if ranked:
+                key, score = ranked[0]
+                _push(heap, top, score, line, key)
+
+    def misses(chunks):
+        "Answer what we can from the cache, yield the rest"
+        for chunk in chunks:
+            if cache is not None:
+                hits = cache.get_many(kind, [data for _, data in chunk])
+                for i, ranked in hits.items():
+                    if ranked:
+                        key, score = ranked[0]
+                        _push(heap, top, score, chunk[i][0], key)
+                chunk = [item for i, item in enumerate(chunk) if i not in hits]
+            if chunk:
+                yield chunk
+
+    chunks = misses(_chunks(lines, chunk_size))
+    if workers == 1:
+        for chunk in chunks:
+            merge(_score_chunk(chunk, prune))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Bound the chunks in flight so memory stays flat
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(_score_chunk, chunk, prune))
+                if len(pending) >= workers * 2:
+                    merge(pending.popleft().result())
+            while pending:
+                merge(pending.popleft().result())
+
+    return [(line, key, -negscore) for negscore, line, key in
+            sorted(heap, reverse=True)]
+
+#######################################
+# MAIN
+#######################################
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Detect single-byte XOR encrypted hex lines')
+    parser.add_argument('infile', nargs='?', default='-',
+                        type=argparse.FileType('r'))
+    parser.add_argument('-n', '--top', type=int, default=TOP_RESULTS)
+    parser.add_argument('-w', '--workers', type=int, default=None)
+    parser.add_argument('-c', '--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--no-prune', action='store_true',
+                        help='score every key, not only printable ones')
+    parser.add_argument('--no-cache', action='store_true',
+                        help="don't read or write the result cache")
+    parser.add_argument('--clear-cache', action='store_true',
+                        help='invalidate the result cache first')
+    instrument.add_arguments(parser)
+    args = parser.parse_args(argv)
+    if instrument.setup(args) and args.workers is None:
+        # Counters are only collected in this process
+        args.workers = 1
+
+    count = 0
+    def counted(lines):
+        nonlocal count
+        for line in lines:
+            count += 1
+            yield line
+
+    start = time.perf_counter()
+    cache = None if args.no_cache else ResultCache()
+    if cache is not None and args.clear_cache:
+        cache.clear()
+    with instrument.stage('scan'):
+        results = detect(counted(args.infile), args.top, args.chunk_size,
+                         args.workers, cache, not args.no_prune)
+    elapsed = time.perf_counter() - start
+
+    for line, key, score in results:
+        plain = bytes(b ^ key for b in unhexlify(line))
+        print('(0x{:02x}) {:.2f}: {}'.format(key, score, line))
+        print('    {!r}'.format(plain))
+    print('Scanned {} lines in {:.3f}s ({:.0f} lines/s)'.format(
+          count, elapsed, count / elapsed if elapsed else 0),
+          file=sys.stderr)
+
+if __name__ == "__main__":
+    main()